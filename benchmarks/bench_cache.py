@@ -0,0 +1,94 @@
+"""
+Benchmark: The scene cache. Dumping and loading with DsonCacheCodec compared to pickle, and the memory held by
+loaded scene data with every material channel mapped, which is what the session cache keeps around for each scene.
+"""
+import contextlib
+import gc
+import io
+import pickle
+import tempfile
+import tracemalloc
+from functools import partial
+from pathlib import Path
+
+from common import import_without_blender, measure, print_header, print_row
+from duf_generator import SceneSpec, write_scene, write_content_library
+
+SCALES = [
+    SceneSpec(nodes=100, materials_per_node=5, channels_per_material=60, instances=1_000, vertices=50),
+    SceneSpec(nodes=300, materials_per_node=8, channels_per_material=120, instances=3_000, vertices=50),
+]
+
+
+def read_scene(spec: SceneSpec):
+    DsonReader = import_without_blender("dson_reader").DsonReader
+
+    with tempfile.TemporaryDirectory() as tmp:
+        content_dir = Path(tmp) / "content"
+        write_content_library(content_dir, spec)
+        scene_file = write_scene(Path(tmp) / "scene.duf", spec)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return DsonReader([content_dir]).read_dson(scene_file)
+
+
+def codec_dump(DsonCacheCodec, dson_data) -> bytes:
+    buffer = io.BytesIO()
+    DsonCacheCodec.dump(dson_data, buffer)
+    return buffer.getvalue()
+
+
+def codec_load(DsonCacheCodec, encoded: bytes):
+    return DsonCacheCodec.load(io.BytesIO(encoded))
+
+
+def map_all_channels(dson_data) -> int:
+    return sum(len(list(material.channels.values())) for obj in dson_data.objects for material in obj.materials)
+
+
+def measure_retained(encoded: bytes, DsonCacheCodec) -> tuple[int, int, int]:
+    gc.collect()
+    tracemalloc.start()
+    loaded = DsonCacheCodec.load(io.BytesIO(encoded))
+    after_load, _ = tracemalloc.get_traced_memory()
+    channel_count = map_all_channels(loaded)
+    gc.collect()
+    after_mapping, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return after_load, after_mapping, channel_count
+
+
+def main():
+    DsonCacheCodec = import_without_blender("dson_cache_codec").DsonCacheCodec
+
+    print_header("Scene cache", "materials", "format", "operation", "size")
+    retained = []
+    for spec in SCALES:
+        dson_data = read_scene(spec)
+        material_count = spec.nodes * spec.materials_per_node
+
+        m = measure(partial(codec_dump, DsonCacheCodec, dson_data))
+        encoded = m.result
+        print_row(m, material_count, "cache", "dump", len(encoded))
+        m = measure(partial(codec_load, DsonCacheCodec, encoded))
+        print_row(m, material_count, "cache", "load", "")
+
+        m = measure(partial(pickle.dumps, dson_data))
+        pickled = m.result
+        print_row(m, material_count, "pickle", "dump", len(pickled))
+        print_row(measure(partial(pickle.loads, pickled)), material_count, "pickle", "load", "")
+
+        retained.append((material_count, len(encoded), *measure_retained(encoded, DsonCacheCodec)))
+
+    print()
+    print("Retained after load")
+    # "per cache byte" is what DsonSessionCache.MEMORY_PER_CACHE_BYTE estimates
+    print(f"{'materials':>14} {'channels':>14} {'after load':>14} {'all mapped':>14} {'per channel':>14} "
+          f"{'per cache byte':>14}")
+    for material_count, cache_size, after_load, after_mapping, channel_count in retained:
+        print(f"{material_count:>14,} {channel_count:>14,} {after_load / 1024 / 1024:>10.1f} MiB "
+              f"{after_mapping / 1024 / 1024:>10.1f} MiB {after_mapping / channel_count:>8.0f} bytes "
+              f"{after_mapping / cache_size:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""
+Benchmark: Building the DSON id to Blender name conversion tables, for scenes with many duplicated nodes.
+"""
+from functools import partial
+
+from common import import_without_blender, measure, print_header, print_row
+
+# (distinct nodes, copies of each)
+SCALES = [(100, 10), (500, 10), (1_000, 20), (2_000, 25)]
+
+
+def synthetic_objects(dd, distinct: int, copies: int) -> list:
+    # DAZ suffixes copies of a node with "-n", the first one keeps the plain id
+    objects = []
+    for d in range(distinct):
+        for c in range(copies):
+            node_id = f"Prop {d}" if c == 0 else f"Prop {d}-{c}"
+            objects.append(dd.DsonObject(node_id, node_id, (0, 0, 0), (0, 0, 0), (0, 0, 0), (1, 1, 1), None, [], []))
+    return objects
+
+
+def main():
+    dd = import_without_blender("dson_data")
+    DsonReader = import_without_blender("dson_reader").DsonReader
+
+    print_header("DsonReader._create_conversion_tables", "nodes", "copies", "objects")
+    for distinct, copies in SCALES:
+        objects = synthetic_objects(dd, distinct, copies)
+        # noinspection PyProtectedMember
+        m = measure(partial(DsonReader._create_conversion_tables, objects))
+        dson_to_blender, _ = m.result
+        assert len(dson_to_blender) == distinct * (copies - 1)
+        print_row(m, distinct, copies, len(objects))
+
+
+if __name__ == '__main__':
+    main()
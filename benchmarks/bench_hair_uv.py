@@ -0,0 +1,162 @@
+"""
+Benchmark: Finding and packing the UV islands of hair strand meshes, as done by HairUVProcessor.
+Compares the previous island search (a Python DisjointSet over a loop over all loops) to the vectorized one (at
+once and chunked), the strip packing to the shelf packing, and the whole processing in its default and its low
+memory (chunked) mode.
+"""
+from functools import partial
+
+import numpy as np
+
+from common import import_without_blender, measure, print_header, print_row
+
+# (strands, segments per strand), each segment is a quad
+SCALES = [(1_000, 10), (10_000, 10), (50_000, 10), (100_000, 20)]
+# Default of the Hair UV Spacing import option
+STRAND_SPACING = 0.01
+# The previous implementation takes minutes beyond this
+MAX_PREVIOUS_LOOPS = 400_000
+# HairUVProcessor.LOW_MEMORY_CHUNK_LOOPS
+LOW_MEMORY_CHUNK_LOOPS = 1 << 20
+
+
+def island_sizes(strands: int, seed: int = 1) -> tuple[np.ndarray, np.ndarray]:
+    """Widths and heights of narrow strands of varying length, like exported hair."""
+    rnd = np.random.default_rng(seed)
+    widths = (0.01 + 0.03 * rnd.random(strands)).astype(np.float32)
+    heights = (0.5 + 0.5 * rnd.random(strands)).astype(np.float32)
+    return widths, heights
+
+
+def strand_mesh(strands: int, segments: int, seed: int = 1) -> tuple[np.ndarray, np.ndarray, int]:
+    """UVs and loop to polygon map of a mesh of quad strips of island_sizes, each at its own (shuffled) spot along U."""
+    widths, lengths = island_sizes(strands, seed)
+    num_polys = strands * segments
+    u0 = (np.random.default_rng(seed).permutation(strands) * 0.05).astype(np.float32)
+    u1 = u0 + widths
+    v = np.linspace(0, 1, segments + 1, dtype=np.float32)
+
+    # Quad corners (u, v index): (u0, k), (u1, k), (u1, k + 1), (u0, k + 1)
+    corner_u = np.stack([u0, u1, u1, u0], axis=1)[:, None, :].repeat(segments, axis=1)
+    k = np.arange(segments)
+    corner_v = np.stack([v[k], v[k], v[k + 1], v[k + 1]], axis=1)[None, :, :] * lengths[:, None, None]
+    uv = np.stack([corner_u.ravel(), corner_v.ravel()], axis=1)
+    loop_to_poly = np.arange(num_polys, dtype=np.int32).repeat(4)
+    return uv, loop_to_poly, num_polys
+
+
+class DisjointSet:
+    def __init__(self, size):
+        self.parent = list(range(size))
+        self.rank = [0] * size
+
+    def find(self, x):
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, x, y):
+        rx, ry = self.find(x), self.find(y)
+        if rx == ry:
+            return
+        if self.rank[rx] < self.rank[ry]:
+            self.parent[rx] = ry
+        else:
+            self.parent[ry] = rx
+            if self.rank[rx] == self.rank[ry]:
+                self.rank[rx] += 1
+
+
+def previous_find_islands(uv: np.ndarray, loop_to_poly: np.ndarray, num_polys: int) -> tuple[np.ndarray, int]:
+    nl = len(loop_to_poly)
+    structured = np.zeros(nl, dtype=[('u', 'f4'), ('v', 'f4'), ('p', 'i4'), ('i', 'i4')])
+    structured['u'], structured['v'] = uv[:, 0], uv[:, 1]
+    structured['p'] = loop_to_poly
+    structured['i'] = np.arange(nl, dtype=np.int32)
+    structured.sort(order=('u', 'v'))
+
+    ds = DisjointSet(num_polys)
+    i = 0
+    while i < nl:
+        j = i + 1
+        while j < nl and structured['u'][j] == structured['u'][i] and structured['v'][j] == structured['v'][i]:
+            ds.union(structured['p'][i], structured['p'][j])
+            j += 1
+        i = j
+
+    loops_root = np.vectorize(ds.find)(loop_to_poly)
+    unique, loops_island = np.unique(loops_root, return_inverse=True)
+    return loops_island, unique.size
+
+
+def process_uvs(uv_islands, uv_packing, uv: np.ndarray, loop_to_poly: np.ndarray, num_polys: int,
+                chunk_size: int | None) -> tuple[np.ndarray, np.ndarray]:
+    """Islands and new UVs as HairUVProcessor.regenerate_uv creates them, on a copy of uv (chunks work in place)."""
+    uv = uv.copy()
+    loops_island, num_islands = uv_islands.find_islands(uv, loop_to_poly, num_polys, chunk_size)
+    u_min, u_max, v_min, v_max = uv_islands.island_bounds(uv, loops_island, num_islands, chunk_size)
+    widths = u_max - u_min
+    heights = v_max - v_min
+    placement = uv_packing.pack_strip(widths, heights, STRAND_SPACING)
+    uv_new = uv_packing.place_islands(uv, loops_island, u_min, v_min, widths, heights, placement, chunk_size)
+    return loops_island, uv_new
+
+
+def same_partition(labels_a: np.ndarray, labels_b: np.ndarray) -> bool:
+    pairs = np.unique(np.stack([labels_a, labels_b], axis=1), axis=0)
+    return len(pairs) == len(np.unique(labels_a)) == len(np.unique(labels_b))
+
+
+def main():
+    uv_islands = import_without_blender("uv_islands", "utils.uv")
+    find_islands = uv_islands.find_islands
+    uv_packing = import_without_blender("uv_packing", "utils.uv")
+
+    print_header("UV islands of strand meshes", "strands", "loops", "method", "islands")
+    for strands, segments in SCALES:
+        uv, loop_to_poly, num_polys = strand_mesh(strands, segments)
+
+        m = measure(partial(find_islands, uv, loop_to_poly, num_polys))
+        loops_island, num_islands = m.result
+        assert num_islands == strands
+        print_row(m, strands, len(loop_to_poly), "vectorized", num_islands)
+
+        m = measure(partial(find_islands, uv, loop_to_poly, num_polys, LOW_MEMORY_CHUNK_LOOPS))
+        assert same_partition(m.result[0], loops_island)
+        print_row(m, strands, len(loop_to_poly), "chunked", m.result[1])
+
+        if len(loop_to_poly) <= MAX_PREVIOUS_LOOPS:
+            m = measure(partial(previous_find_islands, uv, loop_to_poly, num_polys), repeats=1)
+            assert same_partition(m.result[0], loops_island)
+            print_row(m, strands, len(loop_to_poly), "previous", m.result[1])
+
+    print()
+    print("Packing strand islands into the 0-1 tile (texels across a strand in a 4096px texture)")
+    print(f"{'strands':>14} {'packing':>14} {'coverage':>14} {'strand texels':>14} {'wall time':>9}")
+    for strands, _ in SCALES:
+        widths, heights = island_sizes(strands)
+        for packing, pack in [("strip", uv_packing.pack_strip), ("shelf", uv_packing.pack_shelves)]:
+            # Neither packing changes the sizes it is given
+            m = measure(partial(pack, widths, heights, STRAND_SPACING))
+            coverage, median_short_side = uv_packing.packing_quality(m.result[2], m.result[3])
+            print(f"{strands:>14,} {packing:>14} {coverage:>14.0%} {median_short_side * 4096:>14.2f} "
+                  f"{m.wall_time:>8.3f}s")
+
+    print_header("Hair UV processing, default vs low memory mode", "strands", "loops", "mode", "islands")
+    for strands, segments in SCALES:
+        uv, loop_to_poly, num_polys = strand_mesh(strands, segments)
+
+        m = measure(partial(process_uvs, uv_islands, uv_packing, uv, loop_to_poly, num_polys, None))
+        default_islands, default_uv = m.result
+        print_row(m, strands, len(loop_to_poly), "default", strands)
+
+        m = measure(partial(process_uvs, uv_islands, uv_packing, uv, loop_to_poly, num_polys, LOW_MEMORY_CHUNK_LOOPS))
+        assert same_partition(m.result[0], default_islands)
+        assert np.allclose(m.result[1], default_uv, atol=1e-6)
+        print_row(m, strands, len(loop_to_poly), "low memory", strands)
+        del default_islands, default_uv
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark: Grouping instance nodes by their target on a synthetic scene.
+Compares the per-geometry-node scan (previous implementation) to DsonReader's single pass bucketing.
+"""
+from functools import partial
+from urllib import parse as urlparse
+
+from common import import_without_blender, measure, print_header, print_row
+
+SCALES = [(100, 2_500), (200, 5_000), (400, 10_000), (800, 20_000)]
+
+
+def synthetic_scene_nodes(geometry_count: int, instance_count: int) -> list[dict]:
+    nodes = [{"id": f"prop_{i}", "url": f"#prop_{i}", "geometries": [{"id": f"geo_{i}"}]}
+             for i in range(geometry_count)]
+    nodes += [{"id": f"instance_{i}", "url": f"#instance_{i}",
+               "extra": [{"type": "studio/node/instance"},
+                         {"type": "studio_node_channels",
+                          "channels": [{"channel": {"id": "Instance Target",
+                                                    "node": f"#prop_{i % geometry_count}"}}]}]}
+              for i in range(instance_count)]
+    return nodes
+
+
+def scan_per_geometry_node(scene_nodes: list[dict]) -> int:
+    found = 0
+    for node in scene_nodes:
+        if "geometries" not in node:
+            continue
+        found += len([
+            n for n in scene_nodes
+            if "extra" in n
+               and n["extra"][0]["type"] == "studio/node/instance"
+               and urlparse.unquote(n["extra"][1]["channels"][0]["channel"]["node"][1:]) == node["id"]
+        ])
+    return found
+
+
+def group_single_pass(reader_cls, scene_nodes: list[dict]) -> int:
+    # noinspection PyProtectedMember
+    instances_by_target = reader_cls._group_instances_by_target(scene_nodes)
+    return sum(len(instances_by_target.get(node["id"], [])) for node in scene_nodes if "geometries" in node)
+
+
+def main():
+    DsonReader = import_without_blender("dson_reader").DsonReader
+
+    print_header("Grouping instances by target", "geometry nodes", "instances", "method")
+    for geometry_count, instance_count in SCALES:
+        scene = synthetic_scene_nodes(geometry_count, instance_count)
+
+        m = measure(partial(scan_per_geometry_node, scene), repeats=1)
+        assert m.result == instance_count
+        print_row(m, geometry_count, instance_count, "per-node scan")
+
+        m = measure(partial(group_single_pass, DsonReader, scene))
+        assert m.result == instance_count
+        print_row(m, geometry_count, instance_count, "single pass")
+
+
+if __name__ == '__main__':
+    main()
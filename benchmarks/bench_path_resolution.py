@@ -0,0 +1,90 @@
+"""
+Benchmark: Resolving image paths against a content library, by walking the file system case-insensitively
+(DsonReader._resolve_real_path) and through a ContentLibraryIndex, cold (built from scratch) and warm (loaded from
+disk).
+A quarter of the looked up paths match the library's case exactly, half of them don't and a quarter is missing.
+"""
+import tempfile
+from functools import partial
+from pathlib import Path
+
+from common import import_without_blender, measure, print_header, print_row
+
+# (product directories, textures per product)
+SCALES = [(20, 50), (100, 100), (400, 100)]
+LOOKUPS = 2_000
+
+
+def write_library(root: Path, products: int, textures: int) -> list[str]:
+    raw_paths = []
+    for p in range(products):
+        product_dir = root / "runtime" / "textures" / "vendor" / f"product {p}"
+        product_dir.mkdir(parents=True)
+        for t in range(textures):
+            (product_dir / f"texture_{t}.jpg").touch()
+        raw_paths += [f"/runtime/textures/vendor/product%20{p}/texture_{t}.jpg" for t in range(textures)]
+    return raw_paths
+
+
+def lookups(raw_paths: list[str]) -> list[str]:
+    step = max(1, len(raw_paths) // LOOKUPS)
+    selected = raw_paths[::step][:LOOKUPS]
+    result = []
+    for i, raw_path in enumerate(selected):
+        match i % 4:
+            case 0:
+                result.append(raw_path)
+            case 1 | 2:
+                upper_cased = raw_path.replace("/runtime/textures", "/Runtime/Textures")
+                result.append(upper_cased.replace("texture_", "Texture_"))
+            case _:
+                result.append(raw_path.replace(".jpg", "_missing.jpg"))
+    return result
+
+
+def count_resolved(raw_paths: list[str], resolve) -> int:
+    return sum(1 for raw_path in raw_paths if resolve(raw_path) is not None)
+
+
+def resolve_scandir(DsonReader, root: Path, raw_paths: list[str]) -> int:
+    # noinspection PyProtectedMember
+    return count_resolved(raw_paths, partial(DsonReader._resolve_real_path, root))
+
+
+def resolve_index_cold(ContentLibraryIndex, root: Path, index_dir: Path, raw_paths: list[str]) -> int:
+    ContentLibraryIndex._loaded.clear()
+    for index_file in index_dir.iterdir():
+        index_file.unlink()
+    return count_resolved(raw_paths, ContentLibraryIndex.for_library(root, index_dir).resolve)
+
+
+def resolve_index_warm(ContentLibraryIndex, root: Path, index_dir: Path, raw_paths: list[str]) -> int:
+    ContentLibraryIndex._loaded.clear()
+    return count_resolved(raw_paths, ContentLibraryIndex.for_library(root, index_dir).resolve)
+
+
+def main():
+    DsonReader = import_without_blender("dson_reader").DsonReader
+    ContentLibraryIndex = import_without_blender("content_library_index").ContentLibraryIndex
+
+    print_header("Image path resolution", "files", "lookups", "method", "resolved")
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, (products, textures) in enumerate(SCALES):
+            root = Path(tmp) / f"library_{i}"
+            index_dir = Path(tmp) / f"indexes_{i}"
+            index_dir.mkdir()
+            raw_paths = lookups(write_library(root, products, textures))
+            file_count = products * textures
+
+            m = measure(partial(resolve_scandir, DsonReader, root, raw_paths))
+            print_row(m, file_count, len(raw_paths), "scandir", m.result)
+
+            m = measure(partial(resolve_index_cold, ContentLibraryIndex, root, index_dir, raw_paths))
+            print_row(m, file_count, len(raw_paths), "index cold", m.result)
+
+            m = measure(partial(resolve_index_warm, ContentLibraryIndex, root, index_dir, raw_paths))
+            print_row(m, file_count, len(raw_paths), "index warm", m.result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Benchmark: Reading synthetic scene files with DsonReader, streamed and fully parsed, with and without gzip.
+"""
+import dataclasses
+import tempfile
+from functools import partial
+from pathlib import Path
+
+from common import import_without_blender, measure, print_header, print_row
+from duf_generator import SceneSpec, write_scene, write_content_library
+
+SCALES = [
+    SceneSpec(nodes=50, materials_per_node=4, channels_per_material=40, instances=500),
+    SceneSpec(nodes=200, materials_per_node=5, channels_per_material=60, instances=2_000),
+    SceneSpec(nodes=400, materials_per_node=6, channels_per_material=80, instances=10_000, parent_depth=6,
+              vertices=200),
+]
+# Reading is slow enough for run to run noise not to matter much
+REPEATS = 1
+
+
+def read_dson(DsonReader, content_dir: Path, stream_parse: bool, scene_file: Path):
+    # A new reader per run, its path cache would make later runs skip resolving images
+    return DsonReader([content_dir], stream_parse=stream_parse).read_dson(scene_file)
+
+
+def main():
+    DsonReader = import_without_blender("dson_reader").DsonReader
+
+    print_header("DsonReader.read_dson", "nodes", "materials", "instances", "gzip", "parser")
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, spec in enumerate(SCALES):
+            content_dir = Path(tmp) / f"content_{i}"
+            write_content_library(content_dir, spec)
+
+            for use_gzip in (True, False):
+                scene_file = write_scene(Path(tmp) / f"scene_{i}_{use_gzip}.duf",
+                                         dataclasses.replace(spec, use_gzip=use_gzip))
+
+                for stream_parse in (True, False):
+                    m = measure(partial(read_dson, DsonReader, content_dir, stream_parse, scene_file), REPEATS)
+                    print_row(m, spec.nodes, spec.nodes * spec.materials_per_node, spec.instances,
+                              "yes" if use_gzip else "no", "stream" if stream_parse else "json")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Shared helpers of the benchmarks: Importing the DSON modules without Blender, measuring and printing results.
+"""
+import contextlib
+import gc
+import importlib
+import io
+import sys
+import time
+import tracemalloc
+import types
+from pathlib import Path
+from typing import Callable, Any
+
+PACKAGE_ROOT = Path(__file__).parent.parent / "jurajis_daz_materials_to_blender"
+REPEATS = 3
+
+
+def import_without_blender(module_name: str, package: str = "utils.dson"):
+    # Skip the package __init__ files, which import bpy, the DSON and UV island modules themselves do not need Blender.
+    # With bpy available the packages are imported as they are, so they can also be used by modules that need Blender.
+    try:
+        import bpy  # noqa: F401 pylint: disable=unused-import,import-outside-toplevel
+    except ImportError:
+        parts = package.split(".")
+        for depth in range(len(parts) + 1):
+            name = ".".join(["jurajis_daz_materials_to_blender", *parts[:depth]])
+            if name not in sys.modules:
+                module = types.ModuleType(name)
+                module.__path__ = [str(PACKAGE_ROOT.joinpath(*parts[:depth]))]
+                sys.modules[name] = module
+    return importlib.import_module(f"jurajis_daz_materials_to_blender.{package}.{module_name}")
+
+
+class Measurement:
+    def __init__(self, wall_time: float, peak_memory: int, result: Any):
+        self.wall_time = wall_time
+        self.peak_memory = peak_memory
+        self.result = result
+
+    def __str__(self):
+        return f"{self.wall_time:>8.3f}s {self.peak_memory / 1024 / 1024:>9.1f} MiB"
+
+
+def measure(fn: Callable[[], Any], repeats: int = REPEATS) -> Measurement:
+    """
+    Best wall time of a number of runs, and the peak memory allocated during a separate traced run.
+    Output of fn (i.e. stage timings printed by the reader) is swallowed.
+    """
+    timings = []
+    result = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeats):
+            gc.collect()
+            start = time.perf_counter()
+            result = fn()
+            timings.append(time.perf_counter() - start)
+
+        gc.collect()
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return Measurement(min(timings), peak, result)
+
+
+def print_header(title: str, *columns: str):
+    print()
+    print(title)
+    print(" ".join(f"{c:>14}" for c in columns) + f" {'wall time':>9} {'peak memory':>13}")
+
+
+def print_row(measurement: Measurement, *values: Any):
+    print(" ".join(f"{v:>14,}" if isinstance(v, int) else f"{v:>14}" for v in values) + f" {measurement}")
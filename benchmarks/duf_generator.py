@@ -0,0 +1,177 @@
+"""
+Synthetic DAZ scene (.duf) generator for the benchmarks.
+
+Scenes have a chain of parent group nodes, geometry nodes with materials (scene materials with their own channels
+and a material library entry with more), instance nodes targeting random geometry nodes and a geometry library of
+configurable size, which the reader has to skip over. Image channels refer to textures in a content library that
+can be generated alongside, with file names in a different case than the scene refers to them.
+
+Usage: python duf_generator.py out.duf [--nodes 100] [--materials-per-node 5] [--channels-per-material 40]
+                                       [--instances 1000] [--parent-depth 3] [--vertices 500] [--no-gzip]
+                                       [--content-library DIR]
+"""
+import argparse
+import gzip
+import json
+import random
+from dataclasses import dataclass
+from pathlib import Path
+
+CHANNEL_TYPES = ["float", "float_color", "bool", "image", "string"]
+TEXTURES_PER_PRODUCT = 20
+
+
+@dataclass
+class SceneSpec:
+    nodes: int = 100
+    materials_per_node: int = 5
+    channels_per_material: int = 40
+    instances: int = 1000
+    parent_depth: int = 3
+    vertices: int = 500
+    use_gzip: bool = True
+    seed: int = 1
+
+
+def texture_path(node_idx: int, channel_idx: int) -> str:
+    return f"/Runtime/Textures/Vendor/Product%20{node_idx % 10}/Texture_{channel_idx % TEXTURES_PER_PRODUCT}.jpg"
+
+
+def generate_scene(spec: SceneSpec) -> dict:
+    rnd = random.Random(spec.seed)
+
+    def axis(base: float) -> list[dict]:
+        return [{"id": a, "current_value": base + rnd.random()} for a in "xyz"]
+
+    def lib_node(node_id: str) -> dict:
+        return {"id": node_id, "rotation": axis(0), "translation": axis(0), "scale": axis(1),
+                "general_scale": {"current_value": 1.0}, "center_point": axis(0)}
+
+    def channel(node_idx: int, channel_idx: int) -> dict:
+        channel_type = CHANNEL_TYPES[channel_idx % len(CHANNEL_TYPES)]
+        data = {"id": f"Channel {channel_idx}", "type": channel_type}
+        match channel_type:
+            case "float":
+                data.update(value=0.0, current_value=rnd.random())
+            case "float_color":
+                data.update(value=[1, 1, 1], current_value=[rnd.random() for _ in range(3)])
+            case "bool":
+                data.update(value=False, current_value=True)
+            case "image":
+                data.update(current_value=None)
+            case _:
+                data.update(value="", current_value="value")
+        if channel_idx % 10 == 3:
+            data["image_file"] = texture_path(node_idx, channel_idx)
+        return {"channel": data, "group": "/Base"}
+
+    node_library = []
+    geometry_library = []
+    material_library = []
+    scene_nodes = []
+    scene_materials = []
+
+    for depth in range(spec.parent_depth):
+        group_id = f"group_{depth}"
+        node_library.append(lib_node(group_id))
+        group_node = {"id": group_id, "url": f"#{group_id}", "label": f"Group {depth}"}
+        if depth > 0:
+            group_node["parent"] = f"#group_{depth - 1}"
+        scene_nodes.append(group_node)
+
+    for n in range(spec.nodes):
+        node_id = f"prop_{n}"
+        geometry_id = f"geometry_{n}"
+        geometry_library.append({
+            "id": geometry_id,
+            "vertices": {"values": [[rnd.random() for _ in range(3)] for _ in range(spec.vertices)]},
+            "polylist": {"values": [[0, v, v + 1, v + 2] for v in range(spec.vertices)]},
+        })
+        node_library.append(lib_node(node_id))
+        scene_node = {"id": node_id, "url": f"#{node_id}", "label": f"Prop {n}",
+                      "geometries": [{"id": geometry_id, "url": f"#{geometry_id}"}],
+                      "preview": {"center_point": [rnd.random() for _ in range(3)]},
+                      "rotation": axis(0), "translation": axis(0), "scale": axis(1)}
+        if spec.parent_depth > 0:
+            scene_node["parent"] = f"#group_{spec.parent_depth - 1}"
+        scene_nodes.append(scene_node)
+
+        for m in range(spec.materials_per_node):
+            material_id = f"material_{n}_{m}"
+            channels = [channel(n, c) for c in range(spec.channels_per_material)]
+            material_library.append({"id": material_id, "type": "studio/material/uber_iray",
+                                     "extra": [{"type": "studio_material_channels", "channels": channels}]})
+            scene_materials.append({
+                "id": f"{material_id}-1", "url": f"#{material_id}", "geometry": f"#{geometry_id}",
+                "groups": [f"Surface {m}"],
+                "diffuse": {"channel": {"id": "Diffuse Color", "type": "float_color",
+                                        "current_value": [rnd.random() for _ in range(3)], "value": [1, 1, 1]}},
+                "extra": [{"type": "studio/material/uber_iray"},
+                          {"type": "studio_material_channels",
+                           "channels": channels[:spec.channels_per_material // 2]}],
+            })
+
+    for i in range(spec.instances):
+        instance_id = f"instance_{i}"
+        node_library.append(lib_node(instance_id))
+        instance_node = {"id": instance_id, "url": f"#{instance_id}", "label": f"Instance {i}",
+                         "extra": [{"type": "studio/node/instance"},
+                                   {"type": "studio_node_channels",
+                                    "channels": [{"channel": {"id": "Instance Target",
+                                                              "node": f"#prop_{rnd.randrange(spec.nodes)}"}}]}]}
+        if spec.parent_depth > 0:
+            instance_node["parent"] = f"#group_{rnd.randrange(spec.parent_depth)}"
+        scene_nodes.append(instance_node)
+
+    return {
+        "file_version": "0.6.0.0",
+        "asset_info": {"id": "/scene.duf", "type": "scene"},
+        "geometry_library": geometry_library,
+        "node_library": node_library,
+        "material_library": material_library,
+        "scene": {"nodes": scene_nodes, "materials": scene_materials, "current_camera": "#camera"},
+    }
+
+
+def write_scene(path: Path, spec: SceneSpec) -> Path:
+    opener = gzip.open if spec.use_gzip else open
+    with opener(path, "wt", encoding="utf-8") as f:
+        json.dump(generate_scene(spec), f, indent=1)
+    return path
+
+
+def write_content_library(root: Path, spec: SceneSpec) -> list[str]:
+    """Create (empty) texture files for all textures the scene of spec refers to, returns the referenced paths."""
+    raw_paths = sorted({
+        texture_path(n, c)
+        for n in range(spec.nodes)
+        for c in range(spec.channels_per_material)
+        if c % 10 == 3
+    })
+    for raw_path in raw_paths:
+        # Scene files and content libraries do not agree on case, the reader has to resolve case-insensitive
+        file_path = root / raw_path.replace("%20", " ").lstrip("/").replace("Textures", "textures").lower()
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.touch()
+    return raw_paths
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate a synthetic DAZ scene file.")
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--nodes", type=int, default=SceneSpec.nodes)
+    parser.add_argument("--materials-per-node", type=int, default=SceneSpec.materials_per_node)
+    parser.add_argument("--channels-per-material", type=int, default=SceneSpec.channels_per_material)
+    parser.add_argument("--instances", type=int, default=SceneSpec.instances)
+    parser.add_argument("--parent-depth", type=int, default=SceneSpec.parent_depth)
+    parser.add_argument("--vertices", type=int, default=SceneSpec.vertices)
+    parser.add_argument("--no-gzip", action="store_true")
+    parser.add_argument("--seed", type=int, default=SceneSpec.seed)
+    parser.add_argument("--content-library", type=Path, help="Also create the referenced textures in this directory")
+    args = parser.parse_args()
+
+    scene_spec = SceneSpec(args.nodes, args.materials_per_node, args.channels_per_material, args.instances,
+                           args.parent_depth, args.vertices, not args.no_gzip, args.seed)
+    write_scene(args.output, scene_spec)
+    if args.content_library:
+        write_content_library(args.content_library, scene_spec)
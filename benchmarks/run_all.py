@@ -0,0 +1,18 @@
+"""
+Run all benchmarks. They do not need Blender, run them with any Python 3.11+:
+    python benchmarks/run_all.py
+"""
+import bench_cache
+import bench_conversion_tables
+import bench_hair_uv
+import bench_instance_grouping
+import bench_path_resolution
+import bench_read_dson
+
+if __name__ == '__main__':
+    bench_read_dson.main()
+    bench_cache.main()
+    bench_conversion_tables.main()
+    bench_path_resolution.main()
+    bench_instance_grouping.main()
+    bench_hair_uv.main()
@@ -0,0 +1,156 @@
+"""
+Headless batch conversion: Import the materials (and instances) of a DAZ scene into a .blend file, without the UI.
+
+Requires the extension to be installed in Blender. Run it as a script:
+    blender --background --python-exit-code 1 --python <extension dir>/cli.py -- \\
+        --blend scene.blend --duf scene.duf --content-dir "D:/DAZ/My Library" --output converted.blend
+
+Or from Python running in Blender, with the same arguments (the module path depends on the extension repository):
+    from bl_ext.user_default.jurajis_daz_materials_to_blender import cli
+    cli.main(["--blend", "scene.blend", "--duf", "scene.duf"])
+
+--content-dir overrides the content libraries of the add-on preferences for the run only, they are restored after.
+
+A JSON report with per-stage timings is written to --report, or printed to stdout if it is not given.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="cli.py", description="Import DAZ materials into a .blend file.")
+    parser.add_argument("--blend", required=True, type=Path, help="The .blend file with the imported DAZ objects")
+    parser.add_argument("--duf", required=True, type=Path, help="The DAZ scene (.duf) file")
+    parser.add_argument("--content-dir", action="append", default=[], type=Path, dest="content_dirs",
+                        help="A DAZ content library, can be given multiple times. "
+                             "Defaults to the content libraries in the add-on preferences.")
+    parser.add_argument("--output", type=Path, help="Where to save the result, defaults to overwriting --blend")
+    parser.add_argument("--report", type=Path, help="Where to write the JSON report, defaults to stdout")
+    parser.add_argument("--no-instances", action="store_true", help="Do not create instances")
+    parser.add_argument("--rebuild-unchanged", action="store_true",
+                        help="Also rebuild materials of which the DAZ inputs and import settings did not change")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> dict:
+    if argv is None:
+        # Blender passes everything after "--" on to the script
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    args = parse_args(argv)
+
+    import bpy
+    from .properties import props_from_ctx, prefs_from_ctx
+
+    stages: dict[str, float] = {}
+    start = time.time()
+    stage = _StageTimer(stages)
+
+    stage("open_blend", lambda: bpy.ops.wm.open_mainfile(filepath=str(args.blend.resolve())))
+
+    props = props_from_ctx(bpy.context)
+    props.daz_scene_file = str(args.duf.resolve())
+
+    prefs = prefs_from_ctx(bpy.context)
+    saved_content_dirs = [item.path for item in prefs.content_libraries]
+    if args.content_dirs:
+        _set_content_libraries(prefs, [str(content_dir.resolve()) for content_dir in args.content_dirs])
+
+    try:
+        return _convert(args, stages, start)
+    finally:
+        # Preferences may be auto-saved, never leave the overridden libraries behind
+        if args.content_dirs:
+            _set_content_libraries(prefs, saved_content_dirs)
+
+
+def _convert(args: argparse.Namespace, stages: dict[str, float], start: float) -> dict:
+    import bpy
+    from .utils.dson import DsonCacheManager
+
+    stage = _StageTimer(stages)
+    dson_data = stage("read_scene", lambda: DsonCacheManager.get_or_load(bpy.context))
+
+    # noinspection PyUnresolvedReferences
+    import_result = stage("import_materials", lambda: bpy.ops.daz_import.import_all_materials(
+        silent=True, rebuild_unchanged=args.rebuild_unchanged))
+    if "FINISHED" not in import_result:
+        # Without --output the .blend file would be overwritten with a partial result
+        raise Exception(f"Importing materials failed for {args.duf}, {args.blend} was not saved")
+
+    instances_result = None
+    if not args.no_instances:
+        # noinspection PyUnresolvedReferences
+        instances_result = stage("create_instances", lambda: bpy.ops.daz_import.create_instances(silent=True))
+
+    output = (args.output or args.blend).resolve()
+    stage("save_blend", lambda: bpy.ops.wm.save_as_mainfile(filepath=str(output)))
+
+    report = {
+        "blend": str(args.blend),
+        "duf": str(args.duf),
+        "output": str(output),
+        "objects": len(dson_data.objects),
+        "materials": sum(len(obj.materials) for obj in dson_data.objects),
+        "instances": sum(len(obj.instances) for obj in dson_data.objects),
+        "import_materials": sorted(import_result),
+        "create_instances": sorted(instances_result) if instances_result is not None else None,
+        "stages": stages,
+        "total": round(time.time() - start, 3),
+    }
+
+    report_json = json.dumps(report, indent=2)
+    if args.report:
+        args.report.write_text(report_json, encoding="utf-8")
+    else:
+        print(report_json)
+    return report
+
+
+class _StageTimer:
+    """Runs a stage of the conversion, recording its time in the report's stages."""
+
+    def __init__(self, stages: dict[str, float]):
+        self._stages = stages
+
+    def __call__(self, name: str, fn):
+        stage_start = time.time()
+        result = fn()
+        self._stages[name] = round(time.time() - stage_start, 3)
+        return result
+
+
+def _set_content_libraries(prefs, paths: list[str]):
+    prefs.content_libraries.clear()
+    for content_dir in paths:
+        prefs.content_libraries.add().path = content_dir
+
+
+def _find_extension_module() -> str:
+    """The module name Blender installed this extension under, which depends on the extension repository."""
+    import addon_utils
+
+    package_dir = Path(__file__).resolve().parent
+    for module in addon_utils.modules():
+        if Path(module.__file__).resolve().parent == package_dir:
+            return module.__name__
+    raise Exception(f"{package_dir} is not an installed Blender extension")
+
+
+def _ensure_extension_enabled(extension_module: str):
+    import addon_utils
+    import bpy
+
+    if not hasattr(bpy.types.Scene, "daz_import__material_import_properties"):
+        addon_utils.enable(extension_module, default_set=False)
+
+
+if __name__ == "__main__" and not __package__:
+    # Run as a script by Blender, continue in the installed extension, so relative imports resolve
+    import importlib
+
+    _extension_module = _find_extension_module()
+    _ensure_extension_enabled(_extension_module)
+    importlib.import_module(f"{_extension_module}.cli").main()
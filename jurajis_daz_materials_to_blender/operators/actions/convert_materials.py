@@ -2,7 +2,7 @@ import bpy
 from bpy.props import StringProperty, BoolProperty, CollectionProperty, EnumProperty
 from bpy.types import Operator, PropertyGroup
 
-from .import_object_materials import MATERIAL_TYPE_ID_PROP
+from .import_object_materials import MATERIAL_TYPE_ID_PROP, MATERIAL_FINGERPRINT_PROP
 from ..base import OperatorReportMixin
 from ...converters import SHADER_GROUP_CONVERTERS_ENUM_OPTS, converter_by_cls_name
 
@@ -80,5 +80,7 @@ class ConvertMaterialsOperator(OperatorReportMixin, Operator):
 
         for mat in selected_materials:
             mat[MATERIAL_TYPE_ID_PROP] = converter_cls.to_type.material_type_id()
+            # The node tree no longer matches its DSON inputs, have the next import rebuild it
+            mat.pop(MATERIAL_FINGERPRINT_PROP, None)
 
         return {"FINISHED"}
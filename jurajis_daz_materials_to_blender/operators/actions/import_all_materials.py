@@ -1,15 +1,14 @@
-import bpy
-from bpy.types import Operator, Context
+from bpy.types import Context
 
-from ..base import OperatorReportMixin
+from .import_object_materials import MaterialImportOperatorBase
 from ...properties import props_from_ctx
 
 
-class ImportAllMaterialsOperator(OperatorReportMixin, Operator):
+class ImportAllMaterialsOperator(MaterialImportOperatorBase):
     bl_idname = "daz_import.import_all_materials"
     bl_label = "Import All Materials"
     bl_description = "Import Materials from DAZ for all objects."
-    bl_options = {"REGISTER", "BLOCKING"}
+    bl_options = {"REGISTER", "UNDO", "BLOCKING"}
 
     @classmethod
     def poll(cls, context: Context):
@@ -17,20 +16,6 @@ class ImportAllMaterialsOperator(OperatorReportMixin, Operator):
         return props.has_scene_file_set()
 
     def execute(self, context: Context):
-        # Copy current selection and deselect everything
-        prev_selection = context.selected_objects
-        bpy.ops.object.select_all(action='DESELECT')
-
+        # Straight to the import pipeline, going through selection and the object operator is slow for many meshes
         mesh_objects = [obj for obj in context.scene.objects if obj.type == 'MESH']
-
-        for obj in mesh_objects:
-            obj.select_set(True)
-
-        # noinspection PyUnresolvedReferences
-        bpy.ops.daz_import.import_object_materials(use_cached_scene_data=True)
-
-        for obj in mesh_objects:
-            if obj not in prev_selection:
-                obj.select_set(False)
-
-        return {"FINISHED"}
+        return self._import_materials(context, mesh_objects)
@@ -1,39 +1,54 @@
+import time
 from typing import Type
 
 import bpy
 from bpy.props import BoolProperty
-from bpy.types import Operator, Context, Object as BObject
+from bpy.types import Operator, Context, Object as BObject, Material
 
+from .import_shader_group import ImportShaderGroupOperator
 from ..base import OperatorReportMixin
-from ...properties import MaterialImportProperties, props_from_ctx
+from ...properties import MaterialImportProperties, props_from_ctx, prefs_from_ctx
 from ...shaders import SHADER_GROUP_APPLIERS, ShaderGroupApplier
 from ...shaders.fallback import FallbackShaderGroupApplier
 from ...utils.dson import DsonChannels, DsonCacheManager, DsonLoadException
 from ...utils.poll import selected_objects_all_is_mesh
+from ...utils.profiling import ImportProfiler
 from ...utils.slugify import slugify
 
 MATERIAL_TYPE_ID_PROP = "__DAZ_IMPORT_SHADER_TYPE_ID__"
+MATERIAL_FINGERPRINT_PROP = "__DAZ_IMPORT_FINGERPRINT__"
 
 
-class ImportObjectMaterialsOperator(OperatorReportMixin, Operator):
-    bl_idname = "daz_import.import_object_materials"
-    bl_label = "Import Object Materials"
-    bl_description = "Import Materials from DAZ for the selected object."
-    bl_options = {"REGISTER", "UNDO", "BLOCKING"}
+class MaterialImportOperatorBase(OperatorReportMixin, Operator):
+    """Shared material import pipeline of the import operators, applies materials to the given objects in bulk."""
 
     use_cached_scene_data: BoolProperty(
         name="Use cached scene data",
         default=False,
     )
 
-    @classmethod
-    def poll(cls, context: Context):
-        props: MaterialImportProperties = props_from_ctx(context)
-        return props.has_scene_file_set() and selected_objects_all_is_mesh(context)
+    rebuild_unchanged: BoolProperty(
+        name="Rebuild unchanged materials",
+        description="Also rebuild materials of which the DAZ inputs and import settings did not change",
+        default=False,
+    )
 
-    def execute(self, context):
+    def _import_materials(self, context: Context, b_objects: list[BObject]) -> set[str]:
+        if prefs_from_ctx(context).profile_imports:
+            ImportProfiler.start()
+
+        try:
+            result = self._import_materials_of(context, b_objects)
+        finally:
+            profile_report = ImportProfiler.stop()
+
+        if profile_report is not None:
+            self._write_profile_report(context, profile_report)
+        return result
+
+    def _import_materials_of(self, context: Context, b_objects: list[BObject]) -> set[str]:
+        start = time.time()
         props: MaterialImportProperties = props_from_ctx(context)
-        b_objects = context.selected_objects
 
         try:
             dson_data = DsonCacheManager.get_or_load(context)
@@ -41,42 +56,64 @@ class ImportObjectMaterialsOperator(OperatorReportMixin, Operator):
             self.report_error(e.message)
             return {"CANCELLED"}
 
+        objects_mat_channels: list[tuple[BObject, list[DsonChannels]]] = []
         for b_object in b_objects:
             dson_id = dson_data.to_dson_id(b_object.name)
-            node_mat_channels: list[DsonChannels] = \
-                next((node.materials for node in dson_data.objects if node.id == dson_id), [])
+            dson_object = dson_data.object_by_id(dson_id)
+            node_mat_channels: list[DsonChannels] = dson_object.materials if dson_object is not None else []
 
             if not node_mat_channels:
                 self.report_warning(f"Could not find materials for object {b_object.name}. (dson id: {dson_id})")
                 continue
 
-            node_mat_channel_names = [c.name for c in node_mat_channels]
+            node_mat_channel_names = {c.name for c in node_mat_channels}
             direct_children_mat_channels = [
                 material
-                for node in dson_data.objects if node.parent_id == dson_id
+                for node in dson_data.children_of(dson_id)
                 for material in node.materials if material.name not in node_mat_channel_names
             ]
 
-            mat_channels = [*node_mat_channels, *direct_children_mat_channels]
+            objects_mat_channels.append((b_object, [*node_mat_channels, *direct_children_mat_channels]))
+
+        # Import all needed shader groups up front, instead of checking them per object
+        with ImportProfiler.stage("materials.import_groups"):
+            self._import_missing_groups([mat for _, mat_channels in objects_mat_channels for mat in mat_channels])
+
+        built_materials = _BuiltMaterials()
+        # Applier -> fingerprint of the import settings its node trees depend on
+        settings_fingerprints: dict[Type[ShaderGroupApplier], str] = {}
+        applied = unchanged = 0
 
-            self._import_missing_groups(mat_channels)
-            self._apply_materials(b_object, mat_channels, props)
-            self.report_info(f"Applied materials for object {b_object.name}")
+        for b_object, mat_channels in objects_mat_channels:
+            obj_applied, obj_unchanged = self._apply_materials(b_object, mat_channels, props, built_materials,
+                                                               settings_fingerprints)
+            applied += obj_applied
+            unchanged += obj_unchanged
 
+        self.report_info(f"Applied {applied} materials ({unchanged} unchanged, {len(built_materials)} distinct) "
+                         f"on {len(objects_mat_channels)} objects in {time.time() - start:.2f}s")
         return {"FINISHED"}
 
     def _apply_materials(self,
                          b_object: BObject,
                          dson_materials: list[DsonChannels],
-                         props: MaterialImportProperties):
+                         props: MaterialImportProperties,
+                         built_materials: "_BuiltMaterials",
+                         settings_fingerprints: dict[Type[ShaderGroupApplier], str]) -> tuple[int, int]:
+        """Apply the materials of a single object, returns the number of applied and unchanged materials."""
+        applied = unchanged = 0
+        b_materials = _ObjectMaterials(b_object)
+
         for mat_def in dson_materials:
+            mat_start = time.perf_counter()
             mat_name = mat_def.name
             mat_type_id = mat_def.type_id
             channels = mat_def.channels
 
-            material = self._find_material_by_name(b_object, mat_name)
+            material = b_materials.find_by_name(mat_name)
             if not material:
                 continue
+            applied += 1
 
             applier_cls = self._find_applier_by_type_id(mat_type_id)
             if not applier_cls:
@@ -84,45 +121,86 @@ class ImportObjectMaterialsOperator(OperatorReportMixin, Operator):
                                     f"\"{mat_type_id}\" for {b_object.name}[{mat_name}].")
                 applier_cls = FallbackShaderGroupApplier  # Fallback
 
+            # Hashed from the raw channel data, channels are only mapped once the node tree is built
+            with ImportProfiler.stage("materials.fingerprint"):
+                mat_fingerprint = mat_def.fingerprint()
+            fingerprint = f"{mat_fingerprint}:{b_object.name}" if applier_cls.object_dependent else mat_fingerprint
+            settings_fingerprint = settings_fingerprints.get(applier_cls)
+            if settings_fingerprint is None:
+                settings_fingerprint = settings_fingerprints[applier_cls] = \
+                    props.import_settings_fingerprint(applier_cls.import_settings)
+            import_fingerprint = f"{mat_fingerprint}:{settings_fingerprint}"
+
+            if (not self.rebuild_unchanged
+                    and material.get(MATERIAL_FINGERPRINT_PROP) == import_fingerprint
+                    and material.node_tree is not None and len(material.node_tree.nodes) > 0):
+                built_materials.add(fingerprint, material)
+                unchanged += 1
+                ImportProfiler.record_material(b_object.name, mat_name, mat_type_id, "unchanged",
+                                               time.perf_counter() - mat_start)
+                continue
+
+            built_material = built_materials.get(fingerprint)
+            if built_material is not None:
+                outcome = "shared"
+                if built_material != material:
+                    with ImportProfiler.stage("materials.copy"):
+                        if built_materials.contains(material):
+                            # Already built from other inputs for other objects, which keep it
+                            b_materials.replace(material, built_material.copy())
+                        else:
+                            self._replace_with_copy(material, built_material)
+                    outcome = "copied"
+                ImportProfiler.record_material(b_object.name, mat_name, mat_type_id, outcome,
+                                               time.perf_counter() - mat_start)
+                continue
+
+            if built_materials.contains(material):
+                # Already built from other inputs for other objects, which keep it. Build into a copy for this object.
+                material = b_materials.replace(material, material.copy())
+
+            # A build failing halfway leaves a partial node tree, which must not be kept as unchanged by later imports
+            material.pop(MATERIAL_FINGERPRINT_PROP, None)
             material.use_nodes = True
             node_tree = material.node_tree
 
             # Setup defaults
             node_tree.nodes.clear()
 
-            applier = applier_cls(props, b_object, node_tree)
-            applier.apply_shader_group(channels)
+            with ImportProfiler.stage("materials.build_nodes"):
+                applier = applier_cls(props, b_object, node_tree)
+                applier.apply_shader_group(channels)
             material[MATERIAL_TYPE_ID_PROP] = mat_type_id
+            material[MATERIAL_FINGERPRINT_PROP] = import_fingerprint
+            built_materials.add(fingerprint, material)
+            ImportProfiler.record_material(b_object.name, mat_name, mat_type_id, "built",
+                                           time.perf_counter() - mat_start)
 
-    @staticmethod
-    def _find_material_by_name(b_object, mat_name):
-        # Material name exactly equals
-        if mat_name in b_object.data.materials:
-            return b_object.data.materials[mat_name]
-
-        # Slugified material name exactly equals
-        mat_name_slug = slugify(mat_name, lower_case=False)
-        if mat_name_slug in b_object.data.materials:
-            return b_object.data.materials[mat_name_slug]
+        return applied, unchanged
 
-        # Starts with
-        for mat in b_object.data.materials.values():
-            if mat.name.startswith(mat_name):
-                return mat
-            mat_slug = slugify(mat.name, lower_case=False)
-            if mat_slug.startswith(mat_name_slug):
-                return mat
+    def _write_profile_report(self, context: Context, profile_report: dict):
+        report_path = DsonCacheManager.get_profile_report_path(context)
+        ImportProfiler.write_report(profile_report, report_path)
+        self.report_info(f"{ImportProfiler.summarize(profile_report)} (report: {report_path.name})")
 
-        return None
+    @staticmethod
+    def _replace_with_copy(material: Material, source: Material):
+        """
+        Replace material by a copy of source, which was built from the same inputs.
+        Copying is done by Blender in one go, which is a lot faster than building the node tree again.
+        The copy takes over the name and all users of the replaced material.
+        """
+        mat_name = material.name
+        mat_copy = source.copy()
+        material.user_remap(mat_copy)
+        bpy.data.materials.remove(material)
+        mat_copy.name = mat_name
 
     @staticmethod
     def _import_missing_groups(materials: list[DsonChannels]):
         used_mat_types = {mat_def.type_id for mat_def in materials}
         used_builders = [b for b in SHADER_GROUP_APPLIERS if b.material_type_id() in used_mat_types]
-
-        for builder in used_builders:
-            # noinspection PyUnresolvedReferences
-            bpy.ops.daz_import.import_shader_group(group_name=builder.group_name(), silent=True)
+        ImportShaderGroupOperator.import_groups(b.group_name() for b in used_builders)
 
     @staticmethod
     def _find_applier_by_type_id(mat_type_id: str) -> Type[ShaderGroupApplier] | None:
@@ -130,3 +208,81 @@ class ImportObjectMaterialsOperator(OperatorReportMixin, Operator):
             if applier.material_type_id() == mat_type_id:
                 return applier
         return None
+
+
+class ImportObjectMaterialsOperator(MaterialImportOperatorBase):
+    bl_idname = "daz_import.import_object_materials"
+    bl_label = "Import Object Materials"
+    bl_description = "Import Materials from DAZ for the selected object."
+    bl_options = {"REGISTER", "UNDO", "BLOCKING"}
+
+    @classmethod
+    def poll(cls, context: Context):
+        props: MaterialImportProperties = props_from_ctx(context)
+        return props.has_scene_file_set() and selected_objects_all_is_mesh(context)
+
+    def execute(self, context):
+        return self._import_materials(context, context.selected_objects)
+
+
+class _ObjectMaterials:
+    """
+    Finds the materials of an object by (slugified) name. Material names are slugified once per object, not once per
+    lookup. Materials are referred to by name, as replacing a material by a copy keeps its name. Copies used by this
+    object only (see replace()) get a numbered name, which still starts with the original name.
+    """
+
+    def __init__(self, b_object: BObject):
+        self._materials = b_object.data.materials
+        self._names = [mat.name for mat in self._materials.values() if mat is not None]
+        self._slugs = [slugify(name, lower_case=False) for name in self._names]
+
+    def find_by_name(self, mat_name: str) -> Material | None:
+        # Material name exactly equals
+        if mat_name in self._materials:
+            return self._materials[mat_name]
+
+        # Slugified material name exactly equals
+        mat_name_slug = slugify(mat_name, lower_case=False)
+        if mat_name_slug in self._materials:
+            return self._materials[mat_name_slug]
+
+        # Starts with
+        for name, slug in zip(self._names, self._slugs):
+            if name.startswith(mat_name) or slug.startswith(mat_name_slug):
+                return self._materials[name]
+
+        return None
+
+    def replace(self, material: Material, new_material: Material) -> Material:
+        """Use new_material instead of material on this object's mesh only, other users keep material."""
+        for i, slot_material in enumerate(self._materials):
+            if slot_material == material:
+                self._materials[i] = new_material
+        self._names = [mat.name for mat in self._materials.values() if mat is not None]
+        self._slugs = [slugify(name, lower_case=False) for name in self._names]
+        return new_material
+
+
+class _BuiltMaterials:
+    """
+    Materials built (or kept unchanged) during an import by fingerprint, materials with the same inputs are copied
+    instead of built again. Also tells whether a material was built at all, for materials shared by objects.
+    """
+
+    def __init__(self):
+        self._by_fingerprint: dict[str, Material] = {}
+        self._pointers: set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._by_fingerprint)
+
+    def get(self, fingerprint: str) -> Material | None:
+        return self._by_fingerprint.get(fingerprint)
+
+    def add(self, fingerprint: str, material: Material):
+        self._by_fingerprint.setdefault(fingerprint, material)
+        self._pointers.add(material.as_pointer())
+
+    def contains(self, material: Material) -> bool:
+        return material.as_pointer() in self._pointers
@@ -1,4 +1,5 @@
 import re
+from typing import Iterable
 
 import bpy
 from bpy.props import StringProperty
@@ -20,24 +21,39 @@ class ImportShaderGroupOperator(OperatorReportMixin, Operator):
     )
 
     def execute(self, context: Context):
-        library = str(library_path())
-
         if self.group_name in bpy.data.node_groups:
             self.report_warning(f"A Shader Group with name \"{self.group_name}\" already exists!")
             return {"CANCELLED"}
 
-        with bpy.data.libraries.load(filepath=library, link=False) as (data_from, data_to):
-            if not self.group_name in data_from.node_groups:
-                self.report_warning(f"No Shader Group with name \"{self.group_name}\" exists in the library!")
-                return {"CANCELLED"}
-
-            data_to.node_groups.append(self.group_name)
-
-        self._dedupe_groups()
+        _, not_found = self.import_groups([self.group_name])
+        if not_found:
+            self.report_warning(f"No Shader Group with name \"{self.group_name}\" exists in the library!")
+            return {"CANCELLED"}
 
         self.report_info(f"Successfully imported shader group \"{self.group_name}\".")
         return {'FINISHED'}
 
+    @classmethod
+    def import_groups(cls, group_names: Iterable[str]) -> tuple[list[str], list[str]]:
+        """
+        Import all given shader groups that are not present yet, opening the library and deduplicating groups once.
+        Does nothing when all groups are present. Returns the names of the imported groups and of the groups that are
+        not in the library.
+        """
+        missing = [name for name in dict.fromkeys(group_names) if name not in bpy.data.node_groups]
+        if not missing:
+            return [], []
+
+        with bpy.data.libraries.load(filepath=str(library_path()), link=False) as (data_from, data_to):
+            available = set(data_from.node_groups)
+            imported = [name for name in missing if name in available]
+            data_to.node_groups = imported
+
+        if imported:
+            cls._dedupe_groups()
+
+        return imported, [name for name in missing if name not in available]
+
     @staticmethod
     def _dedupe_groups():
         originals = {}
@@ -53,13 +69,19 @@ class ImportShaderGroupOperator(OperatorReportMixin, Operator):
             else:
                 duplicates.append((base_name, group))
 
-        for base_name, dup in duplicates:
-            original = originals[base_name]
-            for user in bpy.data.node_groups:
-                for node in user.nodes:
-                    if node.type == "GROUP" and node.node_tree == dup:
+        if not duplicates:
+            return
+
+        # Duplicate -> original, by pointer, so all group nodes are remapped in a single pass over all node trees
+        replacements = {dup.as_pointer(): originals[base_name] for base_name, dup in duplicates}
+        node_trees = [*bpy.data.node_groups, *(mat.node_tree for mat in bpy.data.materials if mat.node_tree)]
+
+        for node_tree in node_trees:
+            for node in node_tree.nodes:
+                if node.type == "GROUP" and node.node_tree is not None:
+                    original = replacements.get(node.node_tree.as_pointer())
+                    if original is not None:
                         node.node_tree = original
 
-            if not dup.users:
-                bpy.data.node_groups.remove(dup)
+        bpy.data.batch_remove([dup for _, dup in duplicates if not dup.users])
 
@@ -7,7 +7,7 @@ from ...utils.dson import DsonCacheManager
 class DebugClearSceneCacheOperator(OperatorReportMixin, Operator):
     bl_idname = "daz_import.debug_clear_scene_cache"
     bl_label = "Clear Scene Cache"
-    bl_description = "Delete scene cache files."
+    bl_description = "Delete scene cache files and drop scene data kept in memory."
 
     def execute(self, context):
         DsonCacheManager.clear_cache()
@@ -1,5 +1,5 @@
 from bpy.path import abspath
-from bpy.props import CollectionProperty, StringProperty
+from bpy.props import CollectionProperty, StringProperty, BoolProperty
 from bpy.types import AddonPreferences, PropertyGroup, Context
 
 
@@ -29,6 +29,22 @@ class MaterialImportPreferences(AddonPreferences):
         type=ContentLibraryItem,
     )
 
+    index_content_libraries: BoolProperty(
+        name="Index Content Libraries",
+        description="""Keep an index of all files in your content libraries to find textures.
+The index is stored on disk, shared by all scenes and only updated for folders that changed.
+Disable to search the content libraries directly, e.g. when the index is out of sync, the next import reads the
+scene again.""",
+        default=True,
+    )
+
+    profile_imports: BoolProperty(
+        name="Profile Imports",
+        description="""Record the time spent in each stage of importing materials, and per material.
+A summary is reported after each import, the full report is written next to the scene cache files.""",
+        default=False,
+    )
+
     # noinspection PyUnusedLocal
     def draw(self, context: Context):
         layout = self.layout
@@ -46,6 +62,9 @@ class MaterialImportPreferences(AddonPreferences):
         row.operator("daz_import.prefs_win_detect_daz_libraries")
         row.operator("daz_import.prefs_add_library_path")
 
+        layout.prop(self, "index_content_libraries")
+        layout.prop(self, "profile_imports")
+
     def content_libraries_as_paths(self):
         from pathlib import Path
         from bpy.path import abspath
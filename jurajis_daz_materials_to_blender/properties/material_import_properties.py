@@ -1,4 +1,6 @@
-from bpy.props import StringProperty, BoolProperty, FloatProperty, IntProperty
+import hashlib
+
+from bpy.props import StringProperty, BoolProperty, FloatProperty, IntProperty, EnumProperty
 from bpy.types import PropertyGroup
 
 
@@ -78,8 +80,42 @@ Some artist use emission to make surfaces pop. However, this looks bad in Cycles
         max=1.0
     )
 
+    # Blended Dual Lobe Hair Modifiers
+    hair_uv_packing: EnumProperty(
+        name="Hair UV Packing",
+        description="""How strands are laid out in the generated hair UV map.
+Only applies when the UV map is generated, remove it from the hair mesh to generate it again.""",
+        items=[
+            ("STRIP", "Strip", "All strands side by side, each stretched over the full height of the texture"),
+            ("SHELF", "Shelves", "Strands in rows, stretched to fill the texture (does not keep their aspect ratio). "
+                                 "Gives strands a lot more texture space on hair with many strands"),
+        ],
+        default="STRIP",
+    )
+
+    hair_uv_spacing: FloatProperty(
+        name="Hair UV Spacing",
+        description="""Space between strands in the generated hair UV map, relative to the strands' original UVs.
+Only applies when the UV map is generated, remove it from the hair mesh to generate it again.""",
+        default=0.01,
+        min=0.0,
+        max=1.0,
+    )
+
+    hair_uv_low_memory: BoolProperty(
+        name="Low Memory Hair UVs",
+        description="""Generate hair UV maps in chunks, using less memory at a small cost in time.
+Enable when generating UVs for very dense hair runs out of memory.""",
+        default=False,
+    )
+
     def has_scene_file_set(self):
         return self.daz_scene_file != "" and self.daz_scene_file.endswith(".duf")
 
     def exported_scale_float(self) -> float:
         return self.exported_scale / 100
+
+    def import_settings_fingerprint(self, setting_names: tuple[str, ...]) -> str:
+        """Hash of the given settings, i.e. the ones that affect a shader group applier's node trees."""
+        settings = [f"{name}={getattr(self, name)!r}" for name in setting_names]
+        return hashlib.sha1("\n".join(settings).encode("utf-8")).hexdigest()[:16]
@@ -122,6 +122,11 @@ class IrayUberShaderGroupApplier(ShaderGroupApplier):
     IN_TRANSMITTED_COLOR = "Transmitted Color"
     IN_TRANSMITTED_COLOR_MAP = "Transmitted Color Map"
 
+    # Glass may be replaced by the fake glass applier, which brings its own settings
+    import_settings = (*IrayUberAsFakeGlassShaderGroupApplier.import_settings,
+                       "dls_weight_multiplier", "iray_uber_remap_glossy_color_to_roughness", "iray_uber_replace_glass",
+                       "iray_uber_clamp_emission")
+
     @staticmethod
     def group_name() -> str:
         return IRAY_UBER
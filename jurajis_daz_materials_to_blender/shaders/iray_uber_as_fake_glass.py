@@ -11,6 +11,8 @@ class IrayUberAsFakeGlassShaderGroupApplier(ShaderGroupApplier):
 
     OUT_SURFACE = "Surface"
 
+    import_settings = (*ShaderGroupApplier.import_settings, "bump_strength_multiplier")
+
     @staticmethod
     def group_name() -> str:
         return FAKE_GLASS
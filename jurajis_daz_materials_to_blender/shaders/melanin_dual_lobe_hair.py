@@ -1,12 +1,12 @@
 from .library import MELANIN_DUAL_LOBE_HAIR
 from .shader_group_applier import ShaderGroupApplier
 from ..utils.dson import DsonChannel
+from ..utils.profiling import ImportProfiler
 from ..utils.uv import HairUVProcessor
 
 
 class MelaninDualLobeHairShaderApplier(ShaderGroupApplier):
     FIXED_UV_NAME = "FixedHairUV"
-    UV_STRAND_SPACING = 0.01
 
     # Base
     IN_BASE_ROOT_MELANIN = "Base Root Melanin"
@@ -37,6 +37,10 @@ class MelaninDualLobeHairShaderApplier(ShaderGroupApplier):
 
     OUT_SURFACE = "Surface"
 
+    # Generates the hair UV map on the object. The hair UV settings only apply when the UV map is generated, they do
+    # not change the node tree (and thus are not import_settings).
+    object_dependent = True
+
     @staticmethod
     def group_name() -> str:
         return MELANIN_DUAL_LOBE_HAIR
@@ -48,9 +52,12 @@ class MelaninDualLobeHairShaderApplier(ShaderGroupApplier):
     def apply_shader_group(self, channels: dict[str, DsonChannel]):
         super().apply_shader_group(channels)
 
-        processor = HairUVProcessor(self._b_object, self.FIXED_UV_NAME, self.UV_STRAND_SPACING)
+        processor = HairUVProcessor(self._b_object, self.FIXED_UV_NAME,
+                                    self._properties.hair_uv_spacing, self._properties.hair_uv_packing,
+                                    self._properties.hair_uv_low_memory)
         if not processor.uv_exists():
-            processor.regenerate_uv()
+            with ImportProfiler.stage("materials.build_nodes.hair_uv"):
+                processor.regenerate_uv()
 
         self._uv_map.uv_map = self.FIXED_UV_NAME
 
@@ -59,6 +59,9 @@ class PBRSkinShaderGroupApplier(ShaderGroupApplier):
     IN_MAKEUP_METALLIC_WEIGHT_MAP = "Makeup Metallic Weight Map"
     IN_MAKEUP_REDUCE_NORMALS = "Makeup Reduce Normals"
 
+    import_settings = (*ShaderGroupApplier.import_settings,
+                       "bump_strength_multiplier", "dls_weight_multiplier", "pbr_skin_normal_multiplier")
+
     @staticmethod
     def group_name() -> str:
         return PBR_SKIN
@@ -38,6 +38,10 @@ class ShaderGroupApplier:
         2.2044513091402127,
         2.205027676463837,
     )
+    # Appliers that change the object itself (not just the node tree) can only reuse node trees within an object
+    object_dependent = False
+    # Import settings (MaterialImportProperties) read while building the node tree, changing any rebuilds the material
+    import_settings: tuple[str, ...] = ("apply_color_corrections",)
 
     @staticmethod
     def group_name() -> str:
@@ -62,6 +62,12 @@ class ImportMaterialsPanelBase(Panel):
             options_panel.prop(props, "iray_uber_remap_glossy_color_to_roughness")
             options_panel.prop(props, "iray_uber_clamp_emission")
 
+            options_panel.separator()
+            options_panel.label(text="Blended Dual Lobe Hair")
+            options_panel.prop(props, "hair_uv_packing")
+            options_panel.prop(props, "hair_uv_spacing")
+            options_panel.prop(props, "hair_uv_low_memory")
+
         layout.prop(props, "daz_scene_file")
         layout.operator(ImportAllMaterialsOperator.bl_idname)
         layout.operator(ImportObjectMaterialsOperator.bl_idname)
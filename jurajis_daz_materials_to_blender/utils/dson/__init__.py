@@ -1,3 +1,3 @@
-from .dson_reader import DsonReader
-from .dson_cache_manager import DsonCacheManager, DsonLoadException
+from .dson_reader import DsonReader, DsonLoadException
+from .dson_cache_manager import DsonCacheManager
 from .dson_data import *
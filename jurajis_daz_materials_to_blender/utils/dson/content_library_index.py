@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from urllib import parse as urlparse
+
+
+class ContentLibraryIndex:
+    """
+    Persistent index of the files and directories in a content library, mapping lower-cased relative paths to their
+    real relative path. Resolving a path is a dictionary lookup, instead of a walk over the (possibly network mounted)
+    file system.
+
+    Directory modification times are stored with the directory listings. Refreshing stats every known directory but
+    only re-lists the ones that changed since, as adding, removing or renaming an entry changes its parent's mtime.
+    Indexes are shared by all scenes and kept in memory for the rest of the session once loaded, they are refreshed at
+    most once every REFRESH_INTERVAL_SECONDS (or after expire_all()).
+    The index file is plain JSON, it lives in a user writable directory and is loaded without asking.
+    """
+    INDEX_VERSION = 2
+    INDEX_SUFFIX = ".libindex"
+    REFRESH_INTERVAL_SECONDS = 300
+
+    _loaded: dict[Path, "ContentLibraryIndex"] = {}
+
+    def __init__(self, root: Path, index_file: Path):
+        self.root = root
+        self._index_file = index_file
+        # Relative directory path -> (mtime_ns, file names, directory names)
+        self._dirs: dict[str, tuple[int, list[str], list[str]]] = {}
+        # Lower-cased relative file or directory path -> relative path
+        self._paths: dict[str, str] = {}
+        self._refreshed_at: float | None = None
+
+    @classmethod
+    def for_library(cls, root: Path, index_dir: Path) -> "ContentLibraryIndex | None":
+        """Get the (refreshed) index of the content library at root, None if the library is not available."""
+        if not root.is_dir():
+            return None
+
+        index = cls._loaded.get(root)
+        if index is None:
+            root_key = hashlib.sha1(str(root).encode("utf-8")).hexdigest()[:16]
+            index = cls(root, index_dir / f"{root_key}{cls.INDEX_SUFFIX}")
+            index._load()
+            cls._loaded[root] = index
+
+        if index._refreshed_at is None or time.monotonic() - index._refreshed_at > cls.REFRESH_INTERVAL_SECONDS:
+            if index.refresh():
+                index._save()
+        return index
+
+    @classmethod
+    def expire_all(cls):
+        """Have the next for_library() refresh the indexes loaded so far, whenever they were last refreshed."""
+        for index in cls._loaded.values():
+            index._refreshed_at = None
+
+    def resolve(self, raw_path: str) -> Path | None:
+        relative_path = urlparse.unquote(raw_path).replace("\\", "/").lstrip("/")
+        real_relative_path = self._paths.get(relative_path.rstrip("/").lower())
+        return self.root / real_relative_path if real_relative_path is not None else None
+
+    def refresh(self) -> bool:
+        """Bring the index up to date with the file system, returns True if anything changed."""
+        start = time.time()
+        dirs: dict[str, tuple[int, list[str], list[str]]] = {}
+        relisted = 0
+        pending = [""]
+        seen: set[tuple[int, int]] = set()  # Guards against symlinked directory loops
+
+        while pending:
+            rel_dir = pending.pop()
+            abs_dir = self.root / rel_dir if rel_dir else self.root
+
+            try:
+                dir_stat = os.stat(abs_dir)
+            except OSError:
+                continue  # Removed since the last refresh
+
+            if (dir_stat.st_dev, dir_stat.st_ino) in seen:
+                continue
+            seen.add((dir_stat.st_dev, dir_stat.st_ino))
+
+            mtime = dir_stat.st_mtime_ns
+            known = self._dirs.get(rel_dir)
+            if known is not None and known[0] == mtime:
+                entry = known
+            else:
+                entry = self._list_dir(abs_dir, mtime)
+                relisted += 1
+
+            dirs[rel_dir] = entry
+            pending.extend(f"{rel_dir}/{name}" if rel_dir else name for name in entry[2])
+
+        changed = relisted > 0 or dirs.keys() != self._dirs.keys()
+        if changed:
+            self._dirs = dirs
+            self._rebuild_paths()
+        self._refreshed_at = time.monotonic()
+
+        print(f"ContentLibraryIndex[{self.root}]: Refreshed {len(self._paths)} paths, "
+              f"re-listed {relisted} of {len(dirs)} directories in {time.time() - start:.2f}s")
+        return changed
+
+    @staticmethod
+    def _list_dir(abs_dir: Path, mtime: int) -> tuple[int, list[str], list[str]]:
+        files: list[str] = []
+        sub_dirs: list[str] = []
+        try:
+            with os.scandir(abs_dir) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        sub_dirs.append(entry.name)
+                    else:
+                        files.append(entry.name)
+        except OSError:
+            pass
+        return mtime, files, sub_dirs
+
+    def _rebuild_paths(self):
+        paths: dict[str, str] = {}
+        for rel_dir, (_, file_names, dir_names) in self._dirs.items():
+            for name in (*file_names, *dir_names):
+                rel_path = f"{rel_dir}/{name}" if rel_dir else name
+                paths.setdefault(rel_path.lower(), rel_path)
+        self._paths = paths
+
+    def _load(self):
+        if not self._index_file.exists():
+            return
+
+        try:
+            with open(self._index_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+
+            if data["version"] != self.INDEX_VERSION or data["root"] != str(self.root):
+                return
+            dirs = {str(rel_dir): (int(mtime), [str(n) for n in file_names], [str(n) for n in dir_names])
+                    for rel_dir, (mtime, file_names, dir_names) in data["dirs"].items()}
+        except Exception as e:
+            print(f"ContentLibraryIndex[{self.root}]: Ignoring unreadable index file '{self._index_file}': {e}")
+            return
+
+        self._dirs = dirs
+        self._rebuild_paths()
+
+    def _save(self):
+        self._index_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self._index_file, "w", encoding="utf-8") as f:
+            json.dump({"version": self.INDEX_VERSION, "root": str(self.root), "dirs": self._dirs}, f)
@@ -0,0 +1,310 @@
+import struct
+import sys
+from array import array
+from itertools import accumulate
+from typing import BinaryIO
+
+from .dson_data import DsonData, DsonObject, DsonObjectInstance, DsonChannels, DsonChannel, DsonChannelMap, \
+    DsonColorChannel, DsonFloatChannel, DsonBoolChannel, DsonStringChannel, DsonImageChannel
+
+_KIND_COLOR = 0
+_KIND_FLOAT = 1
+_KIND_BOOL = 2
+_KIND_STRING = 3
+_KIND_IMAGE = 4
+
+_CHANNEL_KINDS = {
+    DsonColorChannel: _KIND_COLOR,
+    DsonFloatChannel: _KIND_FLOAT,
+    DsonBoolChannel: _KIND_BOOL,
+    DsonStringChannel: _KIND_STRING,
+    DsonImageChannel: _KIND_IMAGE,
+}
+
+_CHANNEL_FLOAT_COUNTS = {
+    _KIND_COLOR: 7,
+    _KIND_FLOAT: 2,
+    _KIND_BOOL: 2,
+    _KIND_STRING: 0,
+    _KIND_IMAGE: 0,
+}
+
+_NONE = -1
+
+
+class DsonCacheCodec:
+    """
+    Compact, versioned binary encoding of DsonData.
+
+    All strings (ids, labels, channel ids, image paths, etc.) are interned into a single string table and referenced by
+    index. Everything else is stored column-wise in packed int, float and byte arrays, so loading is a handful of bulk
+    array reads followed by a single pass that builds the objects.
+    Identical channels and identical channel sets are stored once. Materials reference a channel set, channel sets
+    reference their channels. Loaded materials with identical channel sets share the same DsonChannelMap and
+    identical channels are the same DsonChannel, so duplicates can be recognized by identity.
+    Channels are only mapped from the (packed) channel columns when read, see DsonChannelMap.
+    The layout does not depend on class or module names, moving classes around does not invalidate caches.
+    """
+    MAGIC = b"DMTC"
+    FORMAT_VERSION = 2
+
+    _HEADER = struct.Struct("<4sH")
+    _SECTION_LENGTH = struct.Struct("<Q")
+
+    @classmethod
+    def dump(cls, dson_data: DsonData, f: BinaryIO):
+        strings: dict[str | None, int] = {}
+
+        def intern(s: str | None) -> int:
+            if s is None:
+                return _NONE
+            idx = strings.get(s)
+            if idx is None:
+                idx = strings[s] = len(strings)
+            return idx
+
+        object_ints = array("i")
+        object_floats = array("d")
+        instance_ints = array("i")
+        instance_floats = array("d")
+        material_ints = array("i")
+        channel_set_ints = array("i")
+        channel_kinds = bytearray()
+        channel_ints = array("i")
+        channel_floats = array("d")
+
+        channel_indexes: dict[tuple, int] = {}
+        channel_set_indexes: dict[tuple[int, ...], int] = {}
+        # Channel maps shared by several materials (i.e. loaded from a cache) are only looked at once
+        channel_set_indexes_by_map: dict[int, int] = {}
+
+        def channel_index(channel: DsonChannel) -> int:
+            kind = _CHANNEL_KINDS[type(channel)]
+            c_ints: tuple[int, ...] = (intern(channel.image_file),)
+            c_floats: tuple[float, ...] = ()
+            if kind == _KIND_COLOR:
+                c_floats = (*channel.value, *channel.default_value, channel.alpha)
+            elif kind == _KIND_FLOAT or kind == _KIND_BOOL:
+                c_floats = (channel.value, channel.default_value)
+            elif kind == _KIND_STRING:
+                c_ints += (intern(channel.value), intern(channel.default_value))
+
+            key = (kind, c_ints, c_floats)
+            idx = channel_indexes.get(key)
+            if idx is None:
+                idx = channel_indexes[key] = len(channel_indexes)
+                channel_kinds.append(kind)
+                channel_ints.extend(c_ints)
+                channel_floats.extend(c_floats)
+            return idx
+
+        def channel_set_index(channels: DsonChannelMap) -> int:
+            idx = channel_set_indexes_by_map.get(id(channels))
+            if idx is not None:
+                return idx
+
+            key = tuple(i for channel_id, channel in channels.items()
+                        for i in (intern(channel_id), channel_index(channel)))
+            idx = channel_set_indexes.get(key)
+            if idx is None:
+                idx = channel_set_indexes[key] = len(channel_set_indexes)
+                channel_set_ints.append(len(channels))
+                channel_set_ints.extend(key)
+            channel_set_indexes_by_map[id(channels)] = idx
+            return idx
+
+        for obj in dson_data.objects:
+            object_ints.extend((intern(obj.id), intern(obj.label), intern(obj.parent_id),
+                                len(obj.materials), len(obj.instances)))
+            object_floats.extend((*obj.origin, *obj.rotation, *obj.translation, *obj.scale))
+
+            for material in obj.materials:
+                material_ints.extend((intern(material.name), intern(material.type_id),
+                                      channel_set_index(material.channels)))
+
+            for instance in obj.instances:
+                instance_ints.extend((intern(instance.id), intern(instance.label)))
+                instance_floats.extend((*instance.origin, *instance.rotation, *instance.translation, *instance.scale))
+
+        conversion_ints = array("i", [len(dson_data.dson_to_blender)])
+        for dson_id, blender_name in dson_data.dson_to_blender.items():
+            conversion_ints.extend((intern(dson_id), intern(blender_name)))
+        for blender_name, dson_id in dson_data.blender_to_dson.items():
+            conversion_ints.extend((intern(blender_name), intern(dson_id)))
+
+        string_lengths = array("q", (len(s) for s in strings.keys()))
+
+        f.write(cls._HEADER.pack(cls.MAGIC, cls.FORMAT_VERSION))
+        cls._write_section(f, "".join(strings.keys()).encode("utf-8"))
+        for section in (string_lengths, object_ints, object_floats, instance_ints, instance_floats, material_ints,
+                        channel_set_ints):
+            cls._write_array(f, section)
+        cls._write_section(f, bytes(channel_kinds))
+        for section in (channel_ints, channel_floats, conversion_ints):
+            cls._write_array(f, section)
+
+    @classmethod
+    def load(cls, f: BinaryIO) -> DsonData:
+        magic, version = cls._HEADER.unpack(f.read(cls._HEADER.size))
+        if magic != cls.MAGIC:
+            raise Exception("Not a DAZ material cache file")
+        if version != cls.FORMAT_VERSION:
+            raise Exception(f"Unsupported cache format version {version}, expected {cls.FORMAT_VERSION}")
+
+        string_blob = cls._read_section(f).decode("utf-8")
+        string_offsets = [0, *accumulate(cls._read_array(f, "q"))]
+        strings = [string_blob[start:end] for start, end in zip(string_offsets, string_offsets[1:])]
+        object_ints = cls._read_array(f, "i")
+        object_floats = cls._read_array(f, "d")
+        instance_ints = cls._read_array(f, "i")
+        instance_floats = cls._read_array(f, "d")
+        material_ints = cls._read_array(f, "i")
+        channel_set_ints = cls._read_array(f, "i")
+        channel_kinds = cls._read_section(f)
+        channel_ints = cls._read_array(f, "i", packed=True)
+        channel_floats = cls._read_array(f, "d", packed=True)
+        conversion_ints = cls._read_array(f, "i")
+
+        def string_at(idx: int) -> str | None:
+            return None if idx == _NONE else strings[idx]
+
+        # Position of each channel in the int and float columns, channels are referenced by their index until mapped
+        channel_int_offsets = array("q", accumulate((3 if kind == _KIND_STRING else 1 for kind in channel_kinds),
+                                                    initial=0))
+        channel_float_offsets = array("q", accumulate((_CHANNEL_FLOAT_COUNTS[kind] for kind in channel_kinds),
+                                                      initial=0))
+
+        mapped_channels: list[DsonChannel | None] = [None] * len(channel_kinds)
+
+        def map_channel(channel_idx: int) -> DsonChannel:
+            channel = mapped_channels[channel_idx]
+            if channel is None:
+                channel = mapped_channels[channel_idx] = read_channel(channel_idx)
+            return channel
+
+        def read_channel(channel_idx: int) -> DsonChannel:
+            kind = channel_kinds[channel_idx]
+            ii = channel_int_offsets[channel_idx]
+            fi = channel_float_offsets[channel_idx]
+            image_file = string_at(channel_ints[ii])
+
+            if kind == _KIND_COLOR:
+                return DsonColorChannel(tuple(channel_floats[fi:fi + 3]),
+                                        tuple(channel_floats[fi + 3:fi + 6]),
+                                        image_file,
+                                        channel_floats[fi + 6])
+            elif kind == _KIND_FLOAT:
+                return DsonFloatChannel(channel_floats[fi], channel_floats[fi + 1], image_file)
+            elif kind == _KIND_BOOL:
+                return DsonBoolChannel(bool(channel_floats[fi]), bool(channel_floats[fi + 1]), image_file)
+            elif kind == _KIND_STRING:
+                return DsonStringChannel(string_at(channel_ints[ii + 1]), string_at(channel_ints[ii + 2]), image_file)
+            else:
+                return DsonImageChannel(None, None, image_file)
+
+        def channel_fingerprint_key(channel_idx: int) -> tuple:
+            # read_channel(channel_idx).fingerprint_key(), straight from the channel columns
+            kind = channel_kinds[channel_idx]
+            ii = channel_int_offsets[channel_idx]
+            fi = channel_float_offsets[channel_idx]
+            image_file = string_at(channel_ints[ii])
+
+            if kind == _KIND_COLOR:
+                return (DsonColorChannel.__name__, tuple(channel_floats[fi:fi + 3]),
+                        tuple(channel_floats[fi + 3:fi + 6]), image_file, channel_floats[fi + 6])
+            elif kind == _KIND_FLOAT:
+                return DsonFloatChannel.__name__, channel_floats[fi], channel_floats[fi + 1], image_file
+            elif kind == _KIND_BOOL:
+                return DsonBoolChannel.__name__, bool(channel_floats[fi]), bool(channel_floats[fi + 1]), image_file
+            elif kind == _KIND_STRING:
+                return (DsonStringChannel.__name__, string_at(channel_ints[ii + 1]), string_at(channel_ints[ii + 2]),
+                        image_file)
+            else:
+                return DsonImageChannel.__name__, None, None, image_file
+
+        channel_maps: list[DsonChannelMap] = []
+        si = 0
+        while si < len(channel_set_ints):
+            entries = channel_set_ints[si + 1:si + 1 + channel_set_ints[si] * 2]
+            channel_maps.append(DsonChannelMap(
+                {strings[entries[ei]]: entries[ei + 1] for ei in range(0, len(entries), 2)},
+                map_channel,
+                channel_fingerprint_key,
+            ))
+            si += 1 + len(entries)
+
+        objects: list[DsonObject] = []
+        mi = ii = 0
+
+        for oi in range(0, len(object_ints), 5):
+            o_id, o_label, o_parent, material_count, instance_count = object_ints[oi:oi + 5]
+            ofi = (oi // 5) * 12
+
+            materials: list[DsonChannels] = []
+            for _ in range(material_count):
+                m_name, m_type_id, channel_set = material_ints[mi:mi + 3]
+                mi += 3
+                materials.append(DsonChannels(name=strings[m_name], type_id=strings[m_type_id],
+                                              channels=channel_maps[channel_set]))
+
+            instances: list[DsonObjectInstance] = []
+            for _ in range(instance_count):
+                i_floats = instance_floats[(ii // 2) * 12:(ii // 2) * 12 + 12]
+                instances.append(DsonObjectInstance(
+                    id=strings[instance_ints[ii]],
+                    label=strings[instance_ints[ii + 1]],
+                    origin=tuple(i_floats[0:3]),
+                    rotation=tuple(i_floats[3:6]),
+                    translation=tuple(i_floats[6:9]),
+                    scale=tuple(i_floats[9:12]),
+                ))
+                ii += 2
+
+            o_floats = object_floats[ofi:ofi + 12]
+            objects.append(DsonObject(
+                id=strings[o_id],
+                label=strings[o_label],
+                origin=tuple(o_floats[0:3]),
+                rotation=tuple(o_floats[3:6]),
+                translation=tuple(o_floats[6:9]),
+                scale=tuple(o_floats[9:12]),
+                parent_id=string_at(o_parent),
+                materials=materials,
+                instances=instances,
+            ))
+
+        conversion_count = conversion_ints[0]
+        pairs = conversion_ints[1:]
+        dson_to_blender = {strings[pairs[i]]: strings[pairs[i + 1]] for i in range(0, conversion_count * 2, 2)}
+        blender_to_dson = {strings[pairs[i]]: strings[pairs[i + 1]] for i in range(conversion_count * 2, len(pairs), 2)}
+
+        return DsonData(objects=objects, dson_to_blender=dson_to_blender, blender_to_dson=blender_to_dson)
+
+    @classmethod
+    def _write_section(cls, f: BinaryIO, data: bytes):
+        f.write(cls._SECTION_LENGTH.pack(len(data)))
+        f.write(data)
+
+    @classmethod
+    def _write_array(cls, f: BinaryIO, values: array):
+        if sys.byteorder != "little":
+            values = array(values.typecode, values)
+            values.byteswap()
+        cls._write_section(f, values.tobytes())
+
+    @classmethod
+    def _read_section(cls, f: BinaryIO) -> bytes:
+        (length,) = cls._SECTION_LENGTH.unpack(f.read(cls._SECTION_LENGTH.size))
+        data = f.read(length)
+        if len(data) != length:
+            raise Exception("Cache file is truncated")
+        return data
+
+    @classmethod
+    def _read_array(cls, f: BinaryIO, typecode: str, packed: bool = False) -> list | array:
+        """Read an array section, as a list for fast indexing or kept packed when it is held on to."""
+        values = array(typecode)
+        values.frombytes(cls._read_section(f))
+        if sys.byteorder != "little":
+            values.byteswap()
+        return values if packed else values.tolist()
@@ -1,18 +1,25 @@
-import pickle
-from os import path
+import hashlib
+import re
+from os import path, stat
 from pathlib import Path
 
 import bpy
 from bpy.path import abspath
 from bpy.types import Context
 
-from .dson_reader import DsonReader
+from .content_library_index import ContentLibraryIndex
+from .dson_cache_codec import DsonCacheCodec
+from .dson_reader import DsonReader, DsonLoadException
 from .dson_data import DsonData
-from ...properties import props_from_ctx, prefs_from_ctx
+from .dson_session_cache import DsonSessionCache
+from ..profiling import ImportProfiler
+from ...properties import props_from_ctx, prefs_from_ctx, MaterialImportPreferences
 
 
 class DsonCacheManager:
     CACHE_SUFFIX = ".matcache"
+    # Bump when the cached data changes shape (DsonData and friends, or what DsonReader puts in them)
+    CACHE_SCHEMA_VERSION = 3
 
     @classmethod
     def get_or_load(cls, context: Context) -> DsonData:
@@ -25,28 +32,46 @@ class DsonCacheManager:
         if not path.exists(scene_file):
             raise Exception(f"Scene file '{scene_file}' not found")
 
-        cache_path = cls._get_cache_file_path_for(props.daz_scene_file)
+        prefs = prefs_from_ctx(context)
+        content_dirs = prefs.content_libraries_as_paths()
+        cache_key = cls._cache_key_for(scene_file, content_dirs, prefs.index_content_libraries)
 
-        if cache_path.exists():
-            with open(cache_path, "rb") as f:
-                dson_data = pickle.load(f)
-        else:
-            prefs = prefs_from_ctx(context)
-            content_dirs = prefs.content_libraries_as_paths()
+        dson_data = DsonSessionCache.get(cache_key)
+        if dson_data is not None:
+            ImportProfiler.count("scene.session_cache_hits")
+            return dson_data
+
+        cache_path = cls._get_cache_file_path_for(props.daz_scene_file, cache_key)
+        with ImportProfiler.stage("scene.load_cache"):
+            dson_data = cls._load_cache_file(cache_path)
+        if dson_data is None:
             if len(content_dirs) == 0:
                 raise Exception("No content libraries found, you can set them in the addon preferences!")
 
-            dson_reader = DsonReader(content_dirs)
-            dson_data = dson_reader.read_dson(scene_file)
+            cls._remove_stale_cache_files(cache_path.parent, props.daz_scene_file)
+
+            with ImportProfiler.stage("scene.index_libraries"):
+                content_indexes = cls._get_content_indexes(content_dirs) if prefs.index_content_libraries else None
 
-            with open(cache_path, "wb") as f:
-                # noinspection PyTypeChecker
-                pickle.dump(dson_data, f)
+            with ImportProfiler.stage("scene.read"):
+                dson_reader = DsonReader(content_dirs, content_indexes=content_indexes)
+                dson_data = dson_reader.read_dson(scene_file)
 
+            with ImportProfiler.stage("scene.write_cache"), open(cache_path, "wb") as f:
+                DsonCacheCodec.dump(dson_data, f)
+
+            # Hand out what a cache hit would, with identical channel sets shared between materials
+            with ImportProfiler.stage("scene.load_cache"):
+                dson_data = cls._load_cache_file(cache_path) or dson_data
+
+        DsonSessionCache.put(cache_key, dson_data, cache_path.stat().st_size)
         return dson_data
 
     @classmethod
     def clear_cache(cls):
+        DsonSessionCache.clear()
+        ContentLibraryIndex.expire_all()
+
         if not bpy.data.is_saved:
             return  # Nothing to do!
         b_file = Path(abspath(bpy.data.filepath))
@@ -56,16 +81,65 @@ class DsonCacheManager:
                 f.unlink(missing_ok=True)
 
     @classmethod
-    def _get_cache_file_path_for(cls, daz_scene_file: str):
+    def get_profile_report_path(cls, context: Context) -> Path:
+        """Where to write the profiling report of an import, next to the scene's cache files."""
+        props = props_from_ctx(context)
+        return cls._get_cache_dir() / f"{path.basename(props.daz_scene_file)}{ImportProfiler.REPORT_SUFFIX}"
+
+    @classmethod
+    def _cache_key_for(cls, scene_file: str, content_dirs: list[Path], use_content_indexes: bool) -> str:
+        """
+        Key of the scene data, changes whenever the scene file, the content libraries, the way they are searched or the
+        cache schema change. Size and modification time are used as a cheap stand-in for the scene file's contents.
+        """
+        scene_stat = stat(scene_file)
+        key_parts = [
+            str(cls.CACHE_SCHEMA_VERSION),
+            scene_file,
+            str(scene_stat.st_size),
+            str(scene_stat.st_mtime_ns),
+            *(str(d) for d in content_dirs),
+            # Switching the index off has to read the scene again, its texture paths may have come from a stale index
+            "indexed" if use_content_indexes else "scanned",
+        ]
+        return hashlib.sha1("\n".join(key_parts).encode("utf-8")).hexdigest()[:16]
+
+    @classmethod
+    def _get_cache_file_path_for(cls, daz_scene_file: str, cache_key: str) -> Path:
+        scene_basename = path.basename(daz_scene_file)
+        return cls._get_cache_dir() / f"{scene_basename}.{cache_key}{cls.CACHE_SUFFIX}"
+
+    @staticmethod
+    def _get_cache_dir() -> Path:
         if not bpy.data.is_saved:
             raise Exception("You need to save your Blender project first.")
         b_file = Path(abspath(bpy.data.filepath))
-        root = b_file.parent
-        scene_basename = path.basename(daz_scene_file)
-        return root / f"{scene_basename}{cls.CACHE_SUFFIX}"
+        return b_file.parent
+
+    @staticmethod
+    def _get_content_indexes(content_dirs: list[Path]) -> list[ContentLibraryIndex]:
+        index_dir = Path(bpy.utils.extension_path_user(MaterialImportPreferences.bl_idname,
+                                                       path="content_indexes", create=True))
+        content_indexes = (ContentLibraryIndex.for_library(content_dir, index_dir) for content_dir in content_dirs)
+        return [content_index for content_index in content_indexes if content_index is not None]
 
+    @staticmethod
+    def _load_cache_file(cache_path: Path) -> DsonData | None:
+        if not cache_path.exists():
+            return None
 
-class DsonLoadException(Exception):
-    def __init__(self, message: str):
-        super().__init__(message)
-        self.message = message
+        try:
+            with open(cache_path, "rb") as f:
+                return DsonCacheCodec.load(f)
+        except Exception as e:
+            print(f"DsonCacheManager: Ignoring unreadable cache file '{cache_path}': {e}")
+            return None
+
+    @classmethod
+    def _remove_stale_cache_files(cls, root: Path, daz_scene_file: str):
+        """Remove cache files of previous versions of the scene, including ones from before caches were keyed."""
+        scene_basename = path.basename(daz_scene_file)
+        pattern = re.compile(rf"{re.escape(scene_basename)}(\.[0-9a-f]{{16}})?{re.escape(cls.CACHE_SUFFIX)}")
+        for f in root.iterdir():
+            if f.is_file() and pattern.fullmatch(f.name):
+                f.unlink(missing_ok=True)
@@ -1,12 +1,14 @@
+import hashlib
+from collections.abc import MutableMapping, Iterator, Callable
 from dataclasses import dataclass, field
-from typing import TypeVar, Generic, Protocol
+from typing import TypeVar, Generic, Protocol, Any
 
 _DMC_V = TypeVar('_DMC_V')
 DsonCoordinate = tuple[float, float, float]
 DsonRGBA = tuple[float, float, float, float]
 
 
-@dataclass
+@dataclass(slots=True)
 class DsonChannel(Generic[_DMC_V]):
     value: _DMC_V
     default_value: _DMC_V
@@ -17,8 +19,11 @@ class DsonChannel(Generic[_DMC_V]):
     def is_set(self):
         return self.value != self.default_value or self.has_image()
 
+    def fingerprint_key(self) -> tuple:
+        return type(self).__name__, self.value, self.default_value, self.image_file
 
-@dataclass
+
+@dataclass(slots=True)
 class DsonColorChannel(DsonChannel[DsonCoordinate]):
     alpha: float = 1.0
 
@@ -28,43 +33,119 @@ class DsonColorChannel(DsonChannel[DsonCoordinate]):
     def as_float(self) -> float:
         return (sum(self.value) / 3) * self.alpha
 
+    def fingerprint_key(self) -> tuple:
+        # Colors read from scene files may hold ints, cached ones always hold floats
+        return (type(self).__name__, tuple(map(float, self.value)), tuple(map(float, self.default_value)),
+                self.image_file, float(self.alpha))
+
 
-@dataclass
+@dataclass(slots=True)
 class DsonFloatChannel(DsonChannel[float]):
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class DsonBoolChannel(DsonChannel[bool]):
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class DsonStringChannel(DsonChannel[str]):
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class DsonImageChannel(DsonChannel[None]):
     def is_set(self):
         return self.has_image()
 
 
-@dataclass
+class DsonChannelMap(MutableMapping[str, DsonChannel]):
+    """
+    Channel id to DsonChannel mapping, which maps raw channel data to a DsonChannel on first access only.
+    Materials carry hundreds of channels while shader group appliers only read a few dozen of them.
+
+    Raw entries are mapped by the given factory and replaced by the result, iteration keeps insertion order.
+    Membership tests, len() and fingerprint() do not map anything. The optional raw_fingerprint_key gives the
+    fingerprint_key() of the channel a raw entry maps to, without mapping it.
+    """
+    __slots__ = ("_entries", "_factory", "_raw_fingerprint_key", "_fingerprint")
+
+    def __init__(self,
+                 raw_channels: dict[str, Any] | None = None,
+                 factory: Callable[[Any], DsonChannel] | None = None,
+                 raw_fingerprint_key: Callable[[Any], tuple] | None = None):
+        self._entries: dict[str, Any] = raw_channels if raw_channels is not None else {}
+        self._factory = factory
+        self._raw_fingerprint_key = raw_fingerprint_key
+        self._fingerprint: str | None = None
+
+    def __getitem__(self, channel_id: str) -> DsonChannel:
+        entry = self._entries[channel_id]
+        if not isinstance(entry, DsonChannel):
+            entry = self._entries[channel_id] = self._factory(entry)
+        return entry
+
+    def __setitem__(self, channel_id: str, channel: DsonChannel):
+        self._entries[channel_id] = channel
+        self._fingerprint = None
+
+    def __delitem__(self, channel_id: str):
+        del self._entries[channel_id]
+        self._fingerprint = None
+
+    def __contains__(self, channel_id: object) -> bool:
+        return channel_id in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"DsonChannelMap({dict(self.items())!r})"
+
+    def fingerprint(self) -> str:
+        """
+        Content hash of all channels, stable across sessions. Hashed once per map, maps are shared by all materials
+        with the same channel set. Without a raw_fingerprint_key, raw entries are mapped for hashing but not kept.
+        """
+        if self._fingerprint is None:
+            digest = hashlib.sha1()
+            for channel_id, entry in self._entries.items():
+                if isinstance(entry, DsonChannel):
+                    key = entry.fingerprint_key()
+                elif self._raw_fingerprint_key is not None:
+                    key = self._raw_fingerprint_key(entry)
+                else:
+                    key = self._factory(entry).fingerprint_key()
+                digest.update(repr((channel_id, key)).encode("utf-8"))
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+
+@dataclass(slots=True)
 class DsonChannels:
     name: str
     type_id: str
-    channels: dict[str, DsonChannel] = field(default_factory=dict)
+    channels: DsonChannelMap = field(default_factory=DsonChannelMap)
+
+    def fingerprint(self) -> str:
+        """Content hash of the material inputs, materials with equal fingerprints result in the same node tree."""
+        return hashlib.sha1(f"{self.type_id}\n{self.channels.fingerprint()}".encode("utf-8")).hexdigest()[:16]
 
 
 class DsonTransforms(Protocol):
+    __slots__ = ()
+
     origin: DsonCoordinate
     rotation: DsonCoordinate
     translation: DsonCoordinate
     scale: DsonCoordinate
 
 
-@dataclass
+@dataclass(slots=True)
 class DsonObjectInstance(DsonTransforms):
     id: str
     label: str
@@ -74,7 +155,7 @@ class DsonObjectInstance(DsonTransforms):
     scale: DsonCoordinate
 
 
-@dataclass
+@dataclass(slots=True)
 class DsonObject(DsonTransforms):
     id: str
     label: str
@@ -87,11 +168,37 @@ class DsonObject(DsonTransforms):
     instances: list[DsonObjectInstance] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class DsonData:
     objects: list[DsonObject]
     dson_to_blender: dict[str, str]
     blender_to_dson: dict[str, str]
+    # Lookup tables over objects, built on first use
+    _objects_by_id: dict[str, DsonObject] | None = field(default=None, init=False, repr=False, compare=False)
+    _children_by_parent_id: dict[str, list[DsonObject]] | None = \
+        field(default=None, init=False, repr=False, compare=False)
+
+    def object_by_id(self, dson_id: str) -> DsonObject | None:
+        if self._objects_by_id is None:
+            self._build_object_indexes()
+        return self._objects_by_id.get(dson_id)
+
+    def children_of(self, dson_id: str) -> list[DsonObject]:
+        if self._children_by_parent_id is None:
+            self._build_object_indexes()
+        return self._children_by_parent_id.get(dson_id, [])
+
+    def _build_object_indexes(self):
+        objects_by_id: dict[str, DsonObject] = {}
+        children_by_parent_id: dict[str, list[DsonObject]] = {}
+
+        for obj in self.objects:
+            objects_by_id.setdefault(obj.id, obj)  # First one wins, as with a linear search
+            if obj.parent_id is not None:
+                children_by_parent_id.setdefault(obj.parent_id, []).append(obj)
+
+        self._objects_by_id = objects_by_id
+        self._children_by_parent_id = children_by_parent_id
 
     def to_blender_name(self, dson_id: str) -> str:
         if dson_id in self.dson_to_blender:
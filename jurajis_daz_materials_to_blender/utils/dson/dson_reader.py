@@ -1,31 +1,85 @@
 import gzip
 import json
 import os
+import sys
+import time
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
 from os import PathLike, path
 from pathlib import Path
+from typing import TextIO, Callable
 from urllib import parse as urlparse
 
+from .content_library_index import ContentLibraryIndex
 from .dson_data import DsonCoordinate, DsonChannel, DsonColorChannel, DsonFloatChannel, DsonBoolChannel, \
-    DsonStringChannel, DsonImageChannel, DsonChannels, DsonObjectInstance, DsonObject, DsonData
+    DsonStringChannel, DsonImageChannel, DsonChannelMap, DsonChannels, DsonObjectInstance, DsonObject, DsonData
+from .dson_stream_parser import DsonStreamParser
 from ..math import tuple_zip_sum, tuple_zip_prod, tuple_mod, tuple_prod
+from ..profiling import ImportProfiler
 from ..slugify import slugify
 
+_Transforms = tuple[DsonCoordinate, DsonCoordinate, DsonCoordinate]
+
+
+@dataclass
+class DsonIndex:
+    """Lookup tables over a parsed scene file, built once per read."""
+    scene_nodes: dict[str, dict]
+    node_library: dict[str, dict] | None
+    material_library: dict[str, dict]
+    scene_materials_by_geometry: dict[str, list[tuple[int, dict]]]
+    instances_by_target: dict[str, list[dict]]
+
 
 class DsonReader:
-    def __init__(self, content_dirs: list[Path]):
-        self.__content_dir_path_cache: dict[str, Path] = {}
+    # The only parts of a scene file the reader uses, everything else is skipped when stream parsing
+    STREAM_KEEP_PATHS = [
+        ("scene", "nodes"),
+        ("scene", "materials"),
+        ("material_library",),
+        ("node_library",),
+    ]
+    # Image lookups are I/O bound (exists/scandir on possibly network mounted libraries), not CPU bound
+    MAX_RESOLVE_WORKERS = 16
+
+    def __init__(self,
+                 content_dirs: list[Path],
+                 stream_parse: bool = True,
+                 content_indexes: list[ContentLibraryIndex] | None = None):
+        self.__content_dir_path_cache: dict[str, Path | None] = {}
         self.__material_shader_type_cache: dict[str, str] = {}
+        self.__transforms_cache: dict[str, _Transforms] = {}
         self.__content_dirs = content_dirs
+        self.__content_indexes = {index.root: index for index in content_indexes or []}
+        self.__stream_parse = stream_parse
 
     def read_dson(self, daz_scene_file: PathLike | str) -> DsonData:
+        start = time.time()
         dson = self._read_dson_file(daz_scene_file)
+        start = self._print_timing(start, "parse scene file", "scene.read.parse")
+
+        index = self._index_dson(dson)
+        self.__transforms_cache = {}
+        start = self._print_timing(start, "index scene", "scene.read.index")
+
         scene_nodes = [n for n in dson["scene"]["nodes"] if "geometries" in n]
 
+        image_count = self._resolve_image_files(scene_nodes, index)
+        start = self._print_timing(start, f"resolve {image_count} image files", "scene.read.resolve_images")
+        ImportProfiler.count("scene.image_files", image_count)
+
+        # Channels are mapped lazily, long after this read. A standalone factory over the resolved paths keeps the scene
+        # data from holding on to the reader (and everything it caches).
+        image_files = {raw_path: sys.intern(str(resolved))
+                       for raw_path, resolved in self.__content_dir_path_cache.items() if resolved is not None}
+        channel_factory = partial(self._map_channel, image_files)
+
         dson_objects = []
 
         for scene_node in scene_nodes:
-            n_base_rot, n_base_trans, n_base_scale = self._find_transforms_recursive(scene_node, None, dson)
+            n_base_rot, n_base_trans, n_base_scale = self._find_transforms_recursive(scene_node, None, index)
 
             # noinspection PyTypeChecker
             dson_objects.append(DsonObject(
@@ -36,11 +90,12 @@ class DsonReader:
                 translation=n_base_trans,
                 scale=n_base_scale,
                 parent_id=self._unquote_daz_ref(scene_node["parent"]) if "parent" in scene_node else None,
-                materials=self._read_material_channels(scene_node, dson),
-                instances=self._read_instances(scene_node, dson)
+                materials=self._read_material_channels(scene_node, index, channel_factory),
+                instances=self._read_instances(scene_node, index)
             ))
 
         dson_to_blender, blender_to_dson = self._create_conversion_tables(dson_objects)
+        self._print_timing(start, f"read {len(dson_objects)} objects", "scene.read.objects")
 
         return DsonData(
             objects=dson_objects,
@@ -48,76 +103,171 @@ class DsonReader:
             blender_to_dson=blender_to_dson,
         )
 
-    def _read_material_channels(self, scene_node: dict, dson: dict) -> list[DsonChannels]:
-        scene_node_geo_ids = [g["id"] for g in scene_node["geometries"]]
-        scene_mats = [
-            m for m in dson['scene']['materials']
-            if self._unquote_daz_ref(m["geometry"]) in scene_node_geo_ids
+    def _index_dson(self, dson: dict) -> DsonIndex:
+        scene_nodes: dict[str, dict] = {}
+        for node in dson["scene"]["nodes"]:
+            scene_nodes.setdefault(node["id"], node)
+
+        node_library: dict[str, dict] | None = None
+        if "node_library" in dson:
+            node_library = {}
+            for lib_node in dson["node_library"]:
+                node_library.setdefault(lib_node["id"], lib_node)
+
+        material_library: dict[str, dict] = {}
+        for lib_mat in dson.get("material_library", []):
+            material_library.setdefault(lib_mat["id"], lib_mat)
+
+        # Materials are kept with their position in the scene file, to keep file order across geometries
+        scene_materials_by_geometry: dict[str, list[tuple[int, dict]]] = defaultdict(list)
+        for i, scene_mat in enumerate(dson["scene"]["materials"]):
+            scene_materials_by_geometry[self._unquote_daz_ref(scene_mat["geometry"])].append((i, scene_mat))
+
+        return DsonIndex(
+            scene_nodes=scene_nodes,
+            node_library=node_library,
+            material_library=material_library,
+            scene_materials_by_geometry=scene_materials_by_geometry,
+            instances_by_target=self._group_instances_by_target(dson["scene"]["nodes"]),
+        )
+
+    @classmethod
+    def _group_instances_by_target(cls, scene_nodes: list[dict]) -> dict[str, list[dict]]:
+        """
+        Bucket all instance nodes by the id of the node they instance, in a single pass over the scene nodes.
+        Instances tend to share a handful of targets, so each distinct target url is only unquoted once.
+        """
+        instances_by_target: dict[str, list[dict]] = defaultdict(list)
+        target_ids: dict[str, str] = {}
+
+        for node in scene_nodes:
+            extra = node.get("extra")
+            if not extra or extra[0]["type"] != "studio/node/instance":
+                continue
+
+            target_url = extra[1]["channels"][0]["channel"]["node"]
+            target_id = target_ids.get(target_url)
+            if target_id is None:
+                target_id = target_ids[target_url] = cls._unquote_daz_ref(target_url)
+
+            instances_by_target[target_id].append(node)
+
+        return instances_by_target
+
+    def _resolve_image_files(self, scene_nodes: list[dict], index: DsonIndex) -> int:
+        """
+        Resolve all distinct image files referenced by the materials of the given scene nodes up front, so channel
+        mapping only hits the path cache. Lookups run concurrently, as each one may take several file system round
+        trips. Materials no object uses (i.e. the rest of an asset's material library) are skipped.
+        """
+        raw_paths = {
+            c_data["image_file"]
+            for scene_node in scene_nodes
+            for scene_mat, lib_mat in self._iter_object_materials(scene_node, index)
+            for material in (scene_mat, lib_mat) if material is not None
+            for c_data in self._iter_raw_channels(material)
+            if c_data.get("image_file") is not None
+        }
+        raw_paths.difference_update(self.__content_dir_path_cache)
+
+        if not raw_paths:
+            return 0
+
+        # Indexed libraries resolve from memory, a thread pool would only add overhead
+        if all(content_dir in self.__content_indexes for content_dir in self.__content_dirs):
+            for raw_path in raw_paths:
+                self._resolve_content_dir_path(raw_path)
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.MAX_RESOLVE_WORKERS, len(raw_paths))) as executor:
+                # Distinct paths only, so workers never write the same path cache entry
+                list(executor.map(self._resolve_content_dir_path, raw_paths))
+
+        return len(raw_paths)
+
+    def _iter_object_materials(self, scene_node: dict, index: DsonIndex):
+        """The scene materials of a node's geometries in file order, each with its material library entry (if any)."""
+        scene_node_geo_ids = {g["id"] for g in scene_node["geometries"]}
+        indexed_scene_mats = [
+            entry
+            for geo_id in scene_node_geo_ids
+            for entry in index.scene_materials_by_geometry.get(geo_id, [])
         ]
-        materials: list[DsonChannels] = []
-        # TODO: If node is a geo shell, check which material groups should not be exported
+        indexed_scene_mats.sort(key=lambda entry: entry[0])
 
-        for scene_mat in scene_mats:
-            mat_library_id = self._unquote_daz_ref(scene_mat["url"])
-            lib_mat = next((m for m in dson["material_library"] if m["id"] == mat_library_id), None)
+        for _, scene_mat in indexed_scene_mats:
+            yield scene_mat, self._find_entry_by_url(index.material_library, scene_mat["url"])
 
-            material = DsonChannels(
-                name=scene_mat["groups"][0],
-                type_id=self._find_shader_type(scene_mat, lib_mat),
-            )
+    @staticmethod
+    def _iter_raw_channels(material: dict):
+        for value in material.values():
+            if isinstance(value, dict) and "channel" in value:
+                yield value["channel"]
+
+        for mat_extra in material.get("extra", []):
+            if mat_extra["type"] == "studio_material_channels":
+                for channel in mat_extra["channels"]:
+                    yield channel["channel"]
+
+    def _read_material_channels(self,
+                                scene_node: dict,
+                                index: DsonIndex,
+                                channel_factory: Callable[[dict], DsonChannel]) -> list[DsonChannels]:
+        materials: list[DsonChannels] = []
+        # TODO: If node is a geo shell, check which material groups should not be exported
 
-            materials.append(material)
+        for scene_mat, lib_mat in self._iter_object_materials(scene_node, index):
+            # Raw channel data only, channels are mapped when first read
+            raw_channels: dict[str, dict] = {}
 
             # 1st level channels
             for key, value in scene_mat.items():
                 if isinstance(value, dict) and "channel" in value:
-                    mat_id = slugify(key)
-                    material.channels[mat_id] = self._map_channel(value["channel"])
+                    mat_id = sys.intern(slugify(key))
+                    raw_channels[mat_id] = value["channel"]
 
             # Extra channels
             for mat_extra in scene_mat.get("extra", []):
                 if mat_extra["type"] == "studio_material_channels":
                     for channel in mat_extra["channels"]:
-                        mat_id = slugify(channel["channel"]["id"])
-                        material.channels[mat_id] = self._map_channel(channel["channel"])
+                        mat_id = sys.intern(slugify(channel["channel"]["id"]))
+                        raw_channels[mat_id] = channel["channel"]
 
             # Material library channels
             if lib_mat:
                 for mat_extra in lib_mat.get("extra", []):
                     if mat_extra["type"] == "studio_material_channels":
                         for channel in mat_extra["channels"]:
-                            mat_id = slugify(channel["channel"]["id"])
-                            if not mat_id in material.channels:
-                                material.channels[mat_id] = self._map_channel(channel["channel"])
+                            mat_id = sys.intern(slugify(channel["channel"]["id"]))
+                            if not mat_id in raw_channels:
+                                raw_channels[mat_id] = channel["channel"]
+
+            materials.append(DsonChannels(
+                name=scene_mat["groups"][0],
+                type_id=self._find_shader_type(scene_mat, lib_mat),
+                channels=DsonChannelMap(raw_channels, channel_factory),
+            ))
 
         return materials
 
-    def _read_instances(self, node: dict, dson: dict) -> list[DsonObjectInstance]:
-        if not "node_library" in dson:
+    def _read_instances(self, node: dict, index: DsonIndex) -> list[DsonObjectInstance]:
+        if index.node_library is None:
             # Scene does not contain a node library. Might be a scene subset.
             return []
 
-        scene_nodes = dson["scene"]["nodes"]
-        node_library = dson["node_library"]
-        instance_scene_nodes = [
-            n for n in scene_nodes
-            if "extra" in n
-               and n["extra"][0]["type"] == "studio/node/instance"
-               and self._unquote_daz_ref(n["extra"][1]["channels"][0]["channel"]["node"]) == node["id"]
-        ]
+        instance_scene_nodes = index.instances_by_target.get(node["id"], [])
 
         if len(instance_scene_nodes) == 0:
             return []
 
         instances: list[DsonObjectInstance] = []
         for instance in instance_scene_nodes:
-            lib_node = self._find_entry_by_url(node_library, instance["url"])
+            lib_node = self._find_entry_by_url(index.node_library, instance["url"])
 
             if not lib_node:
                 continue
 
             instance_rotation, instance_translation, instance_scale = \
-                self._find_transforms_recursive(instance, lib_node, dson)
+                self._find_transforms_recursive(instance, lib_node, index)
             instance_rotation = tuple_mod(instance_rotation, 360.0)
             instance_origin = self._read_point_axis(lib_node, "center_point", 0.0)
 
@@ -134,21 +284,20 @@ class DsonReader:
         return instances
 
     @classmethod
-    def _find_entry_by_url(cls, library: list[dict], url: str):
-        ref = cls._unquote_daz_ref(url)
-        return next((entry for entry in library if entry["id"] == ref), None)
+    def _find_entry_by_url(cls, library: dict[str, dict], url: str) -> dict | None:
+        return library.get(cls._unquote_daz_ref(url))
 
-    @classmethod
-    def _find_transforms_recursive(cls,
+    def _find_transforms_recursive(self,
                                    node: dict,
                                    lib_node: dict | None,
-                                   dson: dict) -> tuple[DsonCoordinate, DsonCoordinate, DsonCoordinate]:
+                                   index: DsonIndex,
+                                   visiting: list[str] | None = None) -> _Transforms:
         if "geometries" in node:
-            n_rot = cls._read_point_axis(node, "rotation", 0.0)
-            n_trans = cls._read_point_axis(node, "translation", 0.0)
+            n_rot = self._read_point_axis(node, "rotation", 0.0)
+            n_trans = self._read_point_axis(node, "translation", 0.0)
 
             sn_gscale = node["general_scale"]["current_value"] if "general_scale" in node else 1.0
-            n_scale = tuple_prod(cls._read_point_axis(node, "scale", 1.0), sn_gscale)
+            n_scale = tuple_prod(self._read_point_axis(node, "scale", 1.0), sn_gscale)
         elif lib_node:
             n_rot = tuple(v["current_value"] for v in lib_node["rotation"])
             n_trans = tuple(v["current_value"] for v in lib_node["translation"])
@@ -159,11 +308,13 @@ class DsonReader:
             n_trans = (0, 0, 0)
             n_scale = (1.0, 1.0, 1.0)
 
-        if "parent" in node and "node_library" in dson:
-            p_scene_node = cls._find_entry_by_url(dson["scene"]["nodes"], node["parent"])
-            if p_scene_node:
-                p_lib_node = cls._find_entry_by_url(dson["node_library"], p_scene_node["url"])
-                p_rot, p_trans, p_scale = cls._find_transforms_recursive(p_scene_node, p_lib_node, dson)
+        if "parent" in node and index.node_library is not None:
+            if visiting is None:
+                visiting = [node["id"]]
+
+            p_transforms = self._find_parent_transforms(node, index, visiting)
+            if p_transforms:
+                p_rot, p_trans, p_scale = p_transforms
 
                 n_rot = tuple_zip_sum(n_rot, p_rot)
                 n_trans = tuple_zip_sum(n_trans, p_trans)
@@ -171,6 +322,34 @@ class DsonReader:
 
         return n_rot, n_trans, n_scale
 
+    def _find_parent_transforms(self,
+                                node: dict,
+                                index: DsonIndex,
+                                visiting: list[str]) -> _Transforms | None:
+        """
+        Accumulated transforms of the node's parent, each parent in the scene is only resolved once per read.
+        visiting holds the chain of nodes being resolved, a parent already in it means the scene's parents form a cycle.
+        """
+        parent_id = self._unquote_daz_ref(node["parent"])
+        if parent_id in self.__transforms_cache:
+            return self.__transforms_cache[parent_id]
+
+        p_scene_node = index.scene_nodes.get(parent_id)
+        if not p_scene_node:
+            return None
+
+        if parent_id in visiting:
+            cycle = " -> ".join(f'"{node_id}"' for node_id in [*visiting[visiting.index(parent_id):], parent_id])
+            raise DsonLoadException(f"Scene file contains a cyclic parent reference: {cycle}")
+
+        visiting.append(parent_id)
+        p_lib_node = self._find_entry_by_url(index.node_library, p_scene_node["url"])
+        p_transforms = self._find_transforms_recursive(p_scene_node, p_lib_node, index, visiting)
+        visiting.pop()
+
+        self.__transforms_cache[parent_id] = p_transforms
+        return p_transforms
+
     @staticmethod
     def _read_point_axis(node: dict, prop_name: str, default: float) -> DsonCoordinate:
         prop = node.get(prop_name, [])
@@ -178,8 +357,7 @@ class DsonReader:
             next((v["current_value"] for v in prop if v["id"] == "y"), default), \
             next((v["current_value"] for v in prop if v["id"] == "z"), default)
 
-    @classmethod
-    def _read_dson_file(cls, dson_file: PathLike | str) -> dict:
+    def _read_dson_file(self, dson_file: PathLike | str) -> dict:
         with open(dson_file, 'rb') as f:
             file_header = f.read(2)
 
@@ -191,7 +369,13 @@ class DsonReader:
 
         # Open once, load data
         with open_func(dson_file, mode, encoding='utf-8') as f:
-            return json.load(f)
+            if ImportProfiler.is_active():
+                f = _ProfiledReader(f, "scene.read.parse.decompress" if is_gzipped else "scene.read.parse.read_file")
+
+            if self.__stream_parse:
+                return DsonStreamParser(f, self.STREAM_KEEP_PATHS).parse()
+            else:
+                return json.load(f)
 
     @staticmethod
     def _unquote_daz_ref(ref: str) -> str:
@@ -292,23 +476,28 @@ class DsonReader:
             return self.__content_dir_path_cache[raw_path]
 
         for content_dir in self.__content_dirs:
-            cd_path = self._resolve_real_path(content_dir, raw_path)
+            content_index = self.__content_indexes.get(content_dir)
+            if content_index is not None:
+                cd_path = content_index.resolve(raw_path)
+            else:
+                cd_path = self._resolve_real_path(content_dir, raw_path)
+
             if not cd_path is None:
                 self.__content_dir_path_cache[raw_path] = cd_path
                 return cd_path
 
+        # Missing files are remembered as well, these are the most expensive to look up
+        self.__content_dir_path_cache[raw_path] = None
         return None
 
-    def _map_channel(self, c_data: dict) -> DsonChannel:
+    @staticmethod
+    def _map_channel(image_files: dict[str, str], c_data: dict) -> DsonChannel:
+        """Map raw channel data, image_files holds the resolved path of all found image files."""
         raw_value = c_data.get("current_value")
         value_type = c_data['type']
 
-        image_file = None
         raw_path = c_data.get("image_file")
-        if raw_path is not None:
-            resolved = self._resolve_content_dir_path(raw_path)
-            if resolved:
-                image_file = str(resolved)
+        image_file = image_files.get(raw_path) if raw_path is not None else None
 
         match value_type:
             case "float_color" | "color":
@@ -329,6 +518,13 @@ class DsonReader:
                 raw_default_value = c_data.get("value", "")
                 return DsonStringChannel(str(raw_value), str(raw_default_value), image_file)
 
+    @staticmethod
+    def _print_timing(start: float, step: str, profiler_stage: str) -> float:
+        now = time.time()
+        print(f"DsonReader: Completed {step} in {now - start:.2f}s")
+        ImportProfiler.add_time(profiler_stage, now - start)
+        return now
+
     @staticmethod
     def _create_conversion_tables(dson_objects: list[DsonObject]) -> tuple[dict[str, str], dict[str, str]]:
         dson_to_blender = {}
@@ -350,3 +546,23 @@ class DsonReader:
                 blender_to_dson[name] = variant
 
         return dson_to_blender, blender_to_dson
+
+
+class DsonLoadException(Exception):
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.message = message
+
+
+class _ProfiledReader:
+    """Text stream proxy, adding the time spent reading (and decompressing) the underlying file to a profiler stage."""
+
+    def __init__(self, stream: TextIO, profiler_stage: str):
+        self._stream = stream
+        self._profiler_stage = profiler_stage
+
+    def read(self, size: int = -1) -> str:
+        start = time.perf_counter()
+        chunk = self._stream.read(size)
+        ImportProfiler.add_time(self._profiler_stage, time.perf_counter() - start)
+        return chunk
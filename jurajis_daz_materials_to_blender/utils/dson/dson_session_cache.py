@@ -0,0 +1,56 @@
+from collections import OrderedDict
+
+from .dson_data import DsonData
+
+
+class DsonSessionCache:
+    """
+    Process wide LRU of loaded scene data, keyed by the scene cache key.
+    Saves re-reading the cache file for every operator invocation on the same scene.
+
+    The memory used by an entry is estimated from the size of its cache file, loaded scene data takes up roughly
+    MEMORY_PER_CACHE_BYTE times the size of its (compact) cache file.
+    """
+    MAX_ENTRIES = 4
+    MAX_MEMORY_BYTES = 1024 * 1024 * 1024
+    # Measured with tracemalloc in benchmarks/bench_cache.py ("per cache byte"): About 3 right after loading and 6 with
+    # every channel mapped, over scenes of 500 to 2400 materials. Rounded up to stay on the safe side of the limit.
+    MEMORY_PER_CACHE_BYTE = 7
+
+    _entries: OrderedDict[str, tuple[DsonData, int]] = OrderedDict()
+    _memory_bytes = 0
+
+    @classmethod
+    def get(cls, cache_key: str) -> DsonData | None:
+        entry = cls._entries.get(cache_key)
+        if entry is None:
+            return None
+
+        cls._entries.move_to_end(cache_key)
+        return entry[0]
+
+    @classmethod
+    def put(cls, cache_key: str, dson_data: DsonData, cache_file_size: int):
+        cls.evict(cache_key)
+
+        memory_bytes = cache_file_size * cls.MEMORY_PER_CACHE_BYTE
+        if memory_bytes > cls.MAX_MEMORY_BYTES:
+            return  # Would never fit, do not flush everything else for it
+
+        cls._entries[cache_key] = (dson_data, memory_bytes)
+        cls._memory_bytes += memory_bytes
+
+        while len(cls._entries) > cls.MAX_ENTRIES or cls._memory_bytes > cls.MAX_MEMORY_BYTES:
+            _, (_, evicted_bytes) = cls._entries.popitem(last=False)
+            cls._memory_bytes -= evicted_bytes
+
+    @classmethod
+    def evict(cls, cache_key: str):
+        entry = cls._entries.pop(cache_key, None)
+        if entry is not None:
+            cls._memory_bytes -= entry[1]
+
+    @classmethod
+    def clear(cls):
+        cls._entries.clear()
+        cls._memory_bytes = 0
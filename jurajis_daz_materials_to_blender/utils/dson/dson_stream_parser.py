@@ -0,0 +1,219 @@
+import json
+import re
+from typing import TextIO, Iterable
+
+_WHITESPACE_RE = re.compile(r'[ \t\n\r]*')
+_BRACKET_RE = re.compile(r'[\[\]{}]')
+_STRING_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_PRIMITIVE_END_RE = re.compile(r'[,}\] \t\n\r]')
+# Characters that can continue a number, if one follows a decoded number it was cut off at the end of the buffer
+_NUMBER_CHARS = frozenset("0123456789.eE+-")
+_DECODER = json.JSONDecoder()
+
+
+class DsonStreamParser:
+    """
+    Incremental DSON (JSON) parser, reading the document in chunks.
+
+    Only values at the given key paths are materialized, everything else (geometry, morphs, modifiers, animations, etc.)
+    is skipped as it streams past, without ever being decoded or held in memory as a whole.
+    Paths are tuples of object keys, e.g. ("scene", "nodes") keeps `dson["scene"]["nodes"]`.
+    Kept values are decoded in a single pass by the json module's decoder, straight from the buffer.
+    """
+    CHUNK_SIZE = 1 << 20
+
+    def __init__(self, stream: TextIO, keep_paths: Iterable[tuple[str, ...]]):
+        self._stream = stream
+        self._keep_paths = set(keep_paths)
+        self._keep_prefixes = {p[:i] for p in self._keep_paths for i in range(1, len(p))}
+        self._buf = ""
+        self._pos = 0
+
+    def parse(self) -> dict:
+        self._skip_whitespace()
+        if self._peek() != "{":
+            raise Exception("DSON document does not start with an object")
+        return self._parse_object(())
+
+    def _parse_object(self, obj_path: tuple[str, ...]) -> dict:
+        result = {}
+        self._expect("{")
+
+        self._skip_whitespace()
+        if self._peek() == "}":
+            self._pos += 1
+            return result
+
+        while True:
+            self._skip_whitespace()
+            key = json.loads(self._scan_value(capture=True))
+            self._skip_whitespace()
+            self._expect(":")
+            self._skip_whitespace()
+
+            value_path = (*obj_path, key)
+            if value_path in self._keep_paths:
+                result[key] = self._decode_value()
+            elif value_path in self._keep_prefixes and self._peek() == "{":
+                result[key] = self._parse_object(value_path)
+            else:
+                self._scan_value(capture=False)
+
+            self._skip_whitespace()
+            c = self._peek()
+            self._pos += 1
+            if c == "}":
+                return result
+            if c != ",":
+                raise Exception(f"Malformed DSON document, expected ',' or '}}' but got '{c}'")
+
+    def _scan_value(self, capture: bool) -> str | None:
+        """
+        Scan past the value at the current position.
+        If capture is True the raw JSON text of the value is returned, else it is dropped while scanning.
+        """
+        parts: list[str] = []
+        start = self._pos
+        c = self._peek()
+
+        if c == '"':
+            while True:
+                match = _STRING_RE.match(self._buf, start)
+                if match:
+                    self._pos = match.end()
+                    return self._buf[start:self._pos] if capture else None
+                self._fill(start)
+                start = 0
+
+        if c not in "{[":
+            while True:
+                match = _PRIMITIVE_END_RE.search(self._buf, start)
+                if match:
+                    self._pos = match.start()
+                    return self._buf[start:self._pos] if capture else None
+                if not self._fill(start, required=False):
+                    self._pos = len(self._buf)
+                    return self._buf[0:] if capture else None
+                start = 0
+
+        # Brackets are counted in bulk between strings, values only ever appear as object members, thus after the
+        # value closes only ',', '}' and whitespace can follow until the next key. If the segment's net depth drops
+        # to zero (or below) the value ended within that segment and its exact end is searched.
+        depth = 0
+        i = start
+        while True:
+            quote = self._buf.find('"', i)
+            segment_end = quote if quote != -1 else len(self._buf)
+            opens = self._buf.count("[", i, segment_end) + self._buf.count("{", i, segment_end)
+            closes = self._buf.count("]", i, segment_end) + self._buf.count("}", i, segment_end)
+
+            if depth + opens - closes <= 0:
+                for match in _BRACKET_RE.finditer(self._buf, i, segment_end):
+                    depth += 1 if match.group() in "[{" else -1
+                    if depth == 0:
+                        self._pos = match.end()
+                        if not capture:
+                            return None
+                        parts.append(self._buf[start:self._pos])
+                        return "".join(parts)
+            depth += opens - closes
+
+            if quote == -1:
+                # Keep what was scanned so far (when capturing) and continue in the next chunk
+                if capture:
+                    parts.append(self._buf[start:])
+                self._fill(len(self._buf))
+                start = i = 0
+                continue
+
+            string_match = _STRING_RE.match(self._buf, quote)
+            if string_match is None:
+                # String crosses the chunk boundary, keep it from the opening quote
+                if capture:
+                    parts.append(self._buf[start:quote])
+                self._fill(quote)
+                start = i = 0
+                continue
+            i = string_match.end()
+
+    def _decode_value(self):
+        """Decode the value at the current position."""
+        if self._peek() != "[":
+            return self._decode_whole_value()
+
+        # Kept values are lists of many small objects (nodes, materials), decoding these one by one means a retry at the
+        # end of a chunk only has to decode a single one again
+        result = []
+        self._expect("[")
+        self._skip_whitespace()
+        if self._peek() == "]":
+            self._pos += 1
+            return result
+
+        while True:
+            self._skip_whitespace()
+            result.append(self._decode_whole_value())
+            self._skip_whitespace()
+            c = self._peek()
+            self._pos += 1
+            if c == "]":
+                return result
+            if c != ",":
+                raise Exception(f"Malformed DSON document, expected ',' or ']' but got '{c}'")
+
+    def _decode_whole_value(self):
+        """Decode the value at the current position, reading more of the document until the value is complete."""
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buf, self._pos)
+                error = None
+            except json.JSONDecodeError as e:
+                value, end, error = None, None, e
+
+            if end is not None and not self._may_continue(value, end):
+                self._pos = end
+                return value
+
+            # Read as much as is buffered (at least a chunk), so the retries stay linear in the size of the value
+            value_start = self._pos
+            if not self._fill(value_start, required=False, size=max(self.CHUNK_SIZE, len(self._buf) - value_start)):
+                if end is None:
+                    raise Exception(f"Malformed DSON document, {error}")
+                self._pos = end - value_start
+                return value
+
+    def _may_continue(self, value, end: int) -> bool:
+        """
+        Whether a value decoded up to end may continue in the next chunk: A value ending with the buffer, or a number
+        followed by what can only be the rest of it (e.g. a buffer ending in "0." or "1e" decodes as 0 and 1).
+        """
+        if end >= len(self._buf):
+            return True
+        return (isinstance(value, (int, float)) and not isinstance(value, bool)
+                and self._buf[end] in _NUMBER_CHARS)
+
+    def _fill(self, keep_from: int, required: bool = True, size: int | None = None) -> bool:
+        """Drop buffered data before keep_from and append the next chunk (of CHUNK_SIZE, unless a size is given)."""
+        chunk = self._stream.read(size or self.CHUNK_SIZE)
+        self._buf = self._buf[keep_from:] + chunk
+        self._pos = max(self._pos - keep_from, 0)
+
+        if not chunk and required:
+            raise Exception("Unexpected end of DSON document")
+        return bool(chunk)
+
+    def _peek(self) -> str:
+        if self._pos >= len(self._buf):
+            self._fill(self._pos)
+        return self._buf[self._pos]
+
+    def _expect(self, c: str):
+        if self._peek() != c:
+            raise Exception(f"Malformed DSON document, expected '{c}' but got '{self._peek()}'")
+        self._pos += 1
+
+    def _skip_whitespace(self):
+        while True:
+            self._pos = _WHITESPACE_RE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf) or not self._fill(self._pos, required=False):
+                return
@@ -4,6 +4,7 @@ from typing import Any, TypeVar, Type
 import bpy
 from bpy.types import NodeTree, Node, NodeSocket, ShaderNodeTexImage, ShaderNodeGroup, NodeSocketColor, NodeSocketFloat
 
+from .profiling import ImportProfiler
 from .slugify import slugify
 
 _TNode = TypeVar('_TNode', bound=Node)
@@ -107,9 +108,11 @@ def add_image_texture(node_tree: NodeTree,
                 return node
 
     try:
-        image = bpy.data.images.load(image_path, check_existing=True)
-        # noinspection PyTypeChecker
-        image.colorspace_settings.name = "Non-Color" if non_color else "sRGB"
+        with ImportProfiler.stage("materials.build_nodes.load_images"):
+            image = bpy.data.images.load(image_path, check_existing=True)
+            # noinspection PyTypeChecker
+            image.colorspace_settings.name = "Non-Color" if non_color else "sRGB"
+        ImportProfiler.count("images.loaded")
     except Exception as e:
         raise Exception(f"Failed to load image {image_path}: {e}")
 
@@ -0,0 +1,104 @@
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class ImportProfiler:
+    """
+    Opt-in, process wide timings of the import pipeline: Time and calls per stage, counters and per-material timings.
+    Recording only happens between start() and stop(), otherwise stages cost a single check.
+
+    Stages are named "<area>.<step>" and may nest, time spent in a nested stage is also part of the outer stage.
+    """
+    REPORT_SUFFIX = ".profile.json"
+
+    _start: float | None = None
+    _stages: dict[str, list[float | int]] = {}
+    _counts: dict[str, int] = {}
+    _materials: list[dict] = []
+
+    @classmethod
+    def start(cls):
+        cls._start = time.perf_counter()
+        cls._stages = {}
+        cls._counts = {}
+        cls._materials = []
+
+    @classmethod
+    def stop(cls) -> dict | None:
+        """Stop recording, returns the report of everything recorded since start() or None if not recording."""
+        if cls._start is None:
+            return None
+
+        report = {
+            "total": round(time.perf_counter() - cls._start, 4),
+            "stages": {name: {"seconds": round(seconds, 4), "calls": calls}
+                       for name, (seconds, calls) in cls._stages.items()},
+            "counts": dict(cls._counts),
+            "materials": sorted(cls._materials, key=lambda m: m["seconds"], reverse=True),
+        }
+        cls._start = None
+        return report
+
+    @classmethod
+    def is_active(cls) -> bool:
+        return cls._start is not None
+
+    @classmethod
+    @contextmanager
+    def stage(cls, name: str):
+        if cls._start is None:
+            yield
+            return
+
+        stage_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            cls.add_time(name, time.perf_counter() - stage_start)
+
+    @classmethod
+    def add_time(cls, name: str, seconds: float, calls: int = 1):
+        if cls._start is None:
+            return
+        entry = cls._stages.get(name)
+        if entry is None:
+            cls._stages[name] = [seconds, calls]
+        else:
+            entry[0] += seconds
+            entry[1] += calls
+
+    @classmethod
+    def count(cls, name: str, n: int = 1):
+        if cls._start is not None:
+            cls._counts[name] = cls._counts.get(name, 0) + n
+
+    @classmethod
+    def record_material(cls, object_name: str, material_name: str, type_id: str, outcome: str, seconds: float):
+        if cls._start is not None:
+            cls._materials.append({
+                "object": object_name,
+                "material": material_name,
+                "type": type_id,
+                "outcome": outcome,
+                "seconds": round(seconds, 4),
+            })
+
+    @staticmethod
+    def write_report(report: dict, report_path: Path):
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    @staticmethod
+    def summarize(report: dict, max_stages: int = 4) -> str:
+        """One line summary of a report, the slowest top-level stages and the slowest material."""
+        top_level = [(name, stage) for name, stage in report["stages"].items()
+                     if not any(name.startswith(f"{other}.") for other in report["stages"] if other != name)]
+        top_level.sort(key=lambda item: item[1]["seconds"], reverse=True)
+        parts = [f"{name} {stage['seconds']:.2f}s" for name, stage in top_level[:max_stages]]
+
+        if report["materials"]:
+            slowest = report["materials"][0]
+            parts.append(f"slowest material {slowest['object']}[{slowest['material']}] {slowest['seconds']:.2f}s")
+        return f"Profiled {report['total']:.2f}s: " + ", ".join(parts)
@@ -1,47 +1,48 @@
 import time
+import tracemalloc
 
 import numpy as np
 from bpy.types import Object as BObject
 
-
-class DisjointSet:
-    def __init__(self, size):
-        self.parent = list(range(size))
-        self.rank = [0] * size
-
-    def find(self, x):
-        while self.parent[x] != x:
-            self.parent[x] = self.parent[self.parent[x]]
-            x = self.parent[x]
-        return x
-
-    def union(self, x, y):
-        rx, ry = self.find(x), self.find(y)
-        if rx == ry:
-            return
-        if self.rank[rx] < self.rank[ry]:
-            self.parent[rx] = ry
-        else:
-            self.parent[ry] = rx
-            if self.rank[rx] == self.rank[ry]:
-                self.rank[rx] += 1
+from .uv_islands import find_islands, island_bounds, loop_to_poly_map
+from .uv_packing import pack_strip, pack_shelves, place_islands, packing_quality
+from ..profiling import ImportProfiler
 
 
 class HairUVProcessor:
+    # Loops per chunk in low memory mode, keeps scratch buffers in the tens of MBs
+    LOW_MEMORY_CHUNK_LOOPS = 1 << 20
+
     def __init__(self, b_object: BObject,
                  uv_layer_name: str,
-                 spacing: float):
+                 spacing: float,
+                 packing: str = "STRIP",
+                 low_memory: bool = False):
         if b_object.type != 'MESH':
             raise RuntimeError("Select a mesh object containing your hair strands")
 
         self.b_object = b_object
         self.uv_layer_name = uv_layer_name
         self.spacing = spacing
+        self.packing = packing
+        self.low_memory = low_memory
 
     def uv_exists(self) -> bool:
         return self.b_object.data.uv_layers.get(self.uv_layer_name) is not None
 
     def regenerate_uv(self):
+        # Peak memory is only reported when asked for, tracing slows down NumPy's allocations
+        trace_memory = (ImportProfiler.is_active() or self.low_memory) and not tracemalloc.is_tracing()
+        if trace_memory:
+            tracemalloc.start()
+
+        try:
+            self._regenerate_uv()
+        finally:
+            if trace_memory:
+                tracemalloc.stop()
+
+    def _regenerate_uv(self):
         mesh = self.b_object.data
 
         start = time.time()
@@ -55,10 +56,8 @@ class HairUVProcessor:
         new_layer = mesh.uv_layers.new(name=self.uv_layer_name)
         self._print_timing(start, "UV layer setup")
 
-        loops = mesh.loops
-        polys = mesh.polygons
-        nl = len(loops)
-        num_polys = len(polys)
+        nl = len(mesh.loops)
+        num_polys = len(mesh.polygons)
 
         # bulk-get old UVs
         uv_old = np.empty((nl * 2,), dtype=np.float32)
@@ -66,90 +65,49 @@ class HairUVProcessor:
         uv_old = uv_old.reshape(nl, 2)
         self._print_timing(start, "bulk-get UVs")
 
-        # prepare new UV buffer
-        uv_new = uv_old.copy()
-
         # build loop->poly map
-        loop_to_poly = np.empty((nl,), dtype=np.int32)
-        for p in polys:
-            s, t = p.loop_start, p.loop_total
-            loop_to_poly[s:s + t] = p.index
+        loop_starts = np.empty((num_polys,), dtype=np.int32)
+        loop_totals = np.empty((num_polys,), dtype=np.int32)
+        mesh.polygons.foreach_get("loop_start", loop_starts)
+        mesh.polygons.foreach_get("loop_total", loop_totals)
+        loop_to_poly = loop_to_poly_map(loop_starts, loop_totals)
         self._print_timing(start, "build loop_to_poly")
 
-        # sort loops by UV
-        structured = np.zeros(nl, dtype=[('u', 'f4'), ('v', 'f4'), ('p', 'i4'), ('i', 'i4')])
-        structured['u'], structured['v'] = uv_old[:, 0], uv_old[:, 1]
-        structured['p'] = loop_to_poly
-        structured['i'] = np.arange(nl, dtype=np.int32)
-        structured.sort(order=('u', 'v'))
-        self._print_timing(start, "sort UVs")
-
-        # union-find on identical UV
-        ds = DisjointSet(num_polys)
-        i = 0
-        while i < nl:
-            j = i + 1
-            while j < nl and structured['u'][j] == structured['u'][i] and structured['v'][j] == structured['v'][i]:
-                ds.union(structured['p'][i], structured['p'][j])
-                j += 1
-            i = j
-        self._print_timing(start, "union-find UV islands")
-
-        # map loops to island roots
-        loops_root = np.vectorize(ds.find)(loop_to_poly)
-        self._print_timing(start, "map loops to roots")
-
-        # relabel
-        unique, loops_island = np.unique(loops_root, return_inverse=True)
-        num_islands = unique.size
-        self._print_timing(start, f"relabel islands ({num_islands})")
-
-        # vectorized min/max per island via sorting & reduce at
-        u = uv_old[:, 0]
-        v = uv_old[:, 1]
-        order = np.argsort(loops_island)
-        labels = loops_island[order]
-        u_s = u[order]
-        v_s = v[order]
-        # group boundaries
-        idx = np.nonzero(np.diff(labels) != 0)[0] + 1
-        boundaries = np.concatenate(([0], idx, [nl]))
-        starts = boundaries[:-1]
-        # reduce
-        u_min = np.minimum.reduceat(u_s, starts)
-        u_max = np.maximum.reduceat(u_s, starts)
-        v_min = np.minimum.reduceat(v_s, starts)
-        v_max = np.maximum.reduceat(v_s, starts)
+        chunk_size = self.LOW_MEMORY_CHUNK_LOOPS if self.low_memory else None
+
+        # union-find on identical UV, fully vectorized
+        loops_island, num_islands = find_islands(uv_old, loop_to_poly, num_polys, chunk_size)
+        del loop_to_poly
+        self._print_timing(start, f"find UV islands ({num_islands})")
+
+        u_min, u_max, v_min, v_max = island_bounds(uv_old, loops_island, num_islands, chunk_size)
         self._print_timing(start, "vectorized min/max")
 
         widths = u_max - u_min
         heights = v_max - v_min
 
-        # normalize islands
-        u_norm = (u - u_min[loops_island]) / (widths[loops_island] + 1e-8)
-        v_norm = (v - v_min[loops_island]) / (heights[loops_island] + 1e-8)
-
-        # compute total width and scale into 0..1
-        scaled_widths = widths + self.spacing
-        total_width = np.sum(scaled_widths)
-        x_offsets = np.zeros(num_islands, dtype=np.float32)
-        x_offsets[1:] = np.cumsum(scaled_widths[:-1])
-        x_offsets /= total_width  # normalize into 0..1
-        scaled_widths /= total_width
-
-        # fit into 0-1 tile
-        new_u = u_norm * scaled_widths[loops_island] + x_offsets[loops_island]
-        new_v = v_norm
+        # place islands in the 0-1 tile
+        if self.packing == "SHELF":
+            placement = pack_shelves(widths, heights, self.spacing)
+        else:
+            placement = pack_strip(widths, heights, self.spacing)
 
-        uv_new[:, 0], uv_new[:, 1] = new_u, new_v
-        self._print_timing(start, "normalize & tile")
+        # new UV buffer, written back as is (foreach_set reads float32 buffers directly, no Python list needed)
+        uv_new = place_islands(uv_old, loops_island, u_min, v_min, widths, heights, placement, chunk_size)
+        coverage, median_short_side = packing_quality(placement[2], placement[3])
+        self._print_timing(start, f"normalize & tile ({self.packing.lower()}, {coverage:.0%} coverage, "
+                                  f"median island short side {median_short_side:.5f})")
 
         # write back
-        flat = uv_new.ravel().astype(np.float32)
-        new_layer.data.foreach_set("uv", flat.tolist())
+        new_layer.data.foreach_set("uv", uv_new.ravel())
         mesh.update()
         self._print_timing(start, f"finished packing {num_islands} islands")
 
     def _print_timing(self, start: float, step: str):
+        memory = ""
+        if tracemalloc.is_tracing():
+            # NumPy reports its allocations to tracemalloc, so the peak covers all arrays of the processor
+            _, peak_memory = tracemalloc.get_traced_memory()
+            memory = f" (peak memory {peak_memory / 1024 / 1024:.1f} MiB)"
         print(f"BlendedHairUVProcessor[{self.b_object.name}][{self.uv_layer_name}]: "
-              f"Completed {step} at {time.time() - start:.2f}s")
+              f"Completed {step} at {time.time() - start:.2f}s{memory}")
@@ -0,0 +1,149 @@
+import numpy as np
+
+
+def loop_to_poly_map(loop_starts: np.ndarray, loop_totals: np.ndarray) -> np.ndarray:
+    """The polygon of each loop, from the first loop and loop count of each polygon (as read with foreach_get)."""
+    # Polygons own consecutive runs of loops, ordering polygons by their first loop lines their runs up
+    order = np.argsort(loop_starts, kind="stable").astype(np.int32)
+    return np.repeat(order, loop_totals[order])
+
+
+def find_islands(uv: np.ndarray,
+                 loop_to_poly: np.ndarray,
+                 num_polys: int,
+                 chunk_size: int | None = None) -> tuple[np.ndarray, int]:
+    """
+    Find the UV islands of a mesh, polygons sharing (exactly) the same UV coordinate are part of the same island.
+    Returns the island of each loop, islands are numbered in order of their lowest polygon index, and the island count.
+
+    With a chunk_size, shared UVs are found with less memory: Instead of sorting all loops at once, loops are split
+    into buckets of about chunk_size loops by a hash of their UV, which keeps loops sharing a UV in the same bucket,
+    and each bucket is sorted on its own. This needs a float32 uv. The edges between polygons sharing a UV are still
+    kept for all loops, at 8M loops of hair strands they set the peak (about 2/3 of the default's).
+    """
+    if chunk_size is None:
+        edges_a, edges_b = _shared_uv_edges(uv, loop_to_poly)
+    else:
+        edges_a, edges_b = _shared_uv_edges_chunked(uv, loop_to_poly, chunk_size)
+
+    poly_roots = connected_components(num_polys, edges_a, edges_b)
+    del edges_a, edges_b
+
+    # Every polygon has loops, so relabeling polygons gives the same islands as relabeling all loops, in less memory
+    unique_roots, poly_island = np.unique(poly_roots, return_inverse=True)
+    return poly_island.astype(np.int32)[loop_to_poly], unique_roots.size
+
+
+def island_bounds(uv: np.ndarray,
+                  loops_island: np.ndarray,
+                  num_islands: int,
+                  chunk_size: int | None = None) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Minimum and maximum U and V of each island.
+    With a chunk_size, loops are reduced chunk by chunk (per run of loops of the same island), instead of sorting all.
+    """
+    if chunk_size is None:
+        # vectorized min/max per island via sorting & reduce at
+        order = np.argsort(loops_island)
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(loops_island[order])) + 1))
+        u_s = uv[order, 0]
+        v_s = uv[order, 1]
+        return (np.minimum.reduceat(u_s, starts), np.maximum.reduceat(u_s, starts),
+                np.minimum.reduceat(v_s, starts), np.maximum.reduceat(v_s, starts))
+
+    u_min = np.full(num_islands, np.inf, dtype=uv.dtype)
+    u_max = np.full(num_islands, -np.inf, dtype=uv.dtype)
+    v_min = np.full(num_islands, np.inf, dtype=uv.dtype)
+    v_max = np.full(num_islands, -np.inf, dtype=uv.dtype)
+
+    for start in range(0, len(loops_island), chunk_size):
+        chunk_islands = loops_island[start:start + chunk_size]
+        run_starts = np.concatenate(([0], np.flatnonzero(np.diff(chunk_islands)) + 1))
+        run_islands = chunk_islands[run_starts]
+        u = uv[start:start + chunk_size, 0]
+        v = uv[start:start + chunk_size, 1]
+        np.minimum.at(u_min, run_islands, np.minimum.reduceat(u, run_starts))
+        np.maximum.at(u_max, run_islands, np.maximum.reduceat(u, run_starts))
+        np.minimum.at(v_min, run_islands, np.minimum.reduceat(v, run_starts))
+        np.maximum.at(v_max, run_islands, np.maximum.reduceat(v, run_starts))
+
+    return u_min, u_max, v_min, v_max
+
+
+def connected_components(count: int, edges_a: np.ndarray, edges_b: np.ndarray) -> np.ndarray:
+    """
+    Connected components of a graph of count nodes, returns the lowest node of its component for each node.
+
+    Vectorized union-find: Each round hooks the higher root of every edge spanning two components onto the lower
+    one and then compresses all paths by pointer jumping. Edges within a single component are dropped as they go.
+    """
+    parent = np.arange(count, dtype=np.int32)
+
+    while edges_a.size > 0:
+        roots_a = parent[edges_a]
+        roots_b = parent[edges_b]
+        spanning = roots_a != roots_b
+        if not spanning.any():
+            break
+
+        edges_a = edges_a[spanning]
+        edges_b = edges_b[spanning]
+        roots_a = roots_a[spanning]
+        roots_b = roots_b[spanning]
+        np.minimum.at(parent, np.maximum(roots_a, roots_b), np.minimum(roots_a, roots_b))
+
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+
+    return parent
+
+
+def _shared_uv_edges(uv: np.ndarray, loop_to_poly: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # Loops with the same UV coordinate end up next to each other, each pair of neighbours connects two polygons
+    order = np.lexsort((uv[:, 1], uv[:, 0]))
+    u_sorted = uv[order, 0]
+    v_sorted = uv[order, 1]
+    same_uv = (u_sorted[1:] == u_sorted[:-1]) & (v_sorted[1:] == v_sorted[:-1])
+    polys_sorted = loop_to_poly[order]
+    return polys_sorted[:-1][same_uv], polys_sorted[1:][same_uv]
+
+
+def _shared_uv_edges_chunked(uv: np.ndarray,
+                             loop_to_poly: np.ndarray,
+                             chunk_size: int) -> tuple[np.ndarray, np.ndarray]:
+    # Besides the edges, this takes 2 bytes per loop (the bucket of each loop) and buffers of about chunk_size loops
+    num_buckets = max(1, (len(uv) + chunk_size - 1) // chunk_size)
+    buckets = np.empty(len(uv), dtype=np.uint16 if num_buckets <= 1 << 16 else np.uint32)
+    for start in range(0, len(uv), chunk_size):
+        buckets[start:start + chunk_size] = _uv_key_hashes(uv[start:start + chunk_size]) % num_buckets
+
+    edges_a = []
+    edges_b = []
+    for bucket in range(num_buckets):
+        loops = np.flatnonzero(buckets == bucket)
+        keys = _uv_keys(uv[loops])
+        order = np.argsort(keys)
+        keys = keys[order]
+        polys = loop_to_poly[loops[order]]
+        del loops, order
+
+        shared = (keys[1:] == keys[:-1]) & (polys[1:] != polys[:-1])
+        edges_a.append(polys[:-1][shared])
+        edges_b.append(polys[1:][shared])
+
+    return np.concatenate(edges_a), np.concatenate(edges_b)
+
+
+def _uv_keys(uv: np.ndarray) -> np.ndarray:
+    """Both coordinates of each UV (float32) as a single 64-bit key, equal UVs have equal keys."""
+    # A copy, -0.0 equals 0.0 but not as bits
+    uv = uv + np.float32(0.0)
+    return uv.view(np.uint64).ravel()
+
+
+def _uv_key_hashes(uv: np.ndarray) -> np.ndarray:
+    # Fibonacci hashing, spreads the (clustered) UV bits over the high bits of the hash
+    return (_uv_keys(uv) * np.uint64(0x9E3779B97F4A7C15)) >> np.uint64(32)
@@ -0,0 +1,131 @@
+import numpy as np
+
+# Shelf widths tried, relative to the side of a square with the total island area, the fullest layout wins
+SHELF_WIDTH_FACTORS = np.geomspace(0.5, 2.0, 9)
+
+_Placement = tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+def pack_strip(widths: np.ndarray, heights: np.ndarray, spacing: float) -> _Placement:
+    """
+    Place all islands side by side along U, each stretched to the full height of the tile.
+    Returns the U and V offset and the placed width and height of each island, in the 0-1 tile.
+    """
+    scaled_widths = widths + spacing
+    total_width = np.sum(scaled_widths)
+    x_offsets = np.zeros(widths.size, dtype=np.float32)
+    x_offsets[1:] = np.cumsum(scaled_widths[:-1])
+    x_offsets /= total_width  # normalize into 0..1
+    scaled_widths /= total_width
+
+    return x_offsets, np.zeros_like(x_offsets), scaled_widths, np.ones_like(x_offsets)
+
+
+def pack_shelves(widths: np.ndarray, heights: np.ndarray, spacing: float) -> _Placement:
+    """
+    Place islands in rows (shelves) and stretch the result to fill the tile. Each shelf width is tried at the islands'
+    proportions, the final fit scales U and V independently (like pack_strip), so islands are stretched by the aspect
+    ratio of the layout, in exchange for using the whole tile.
+    Islands are sorted by height, so each shelf is as high as its first island. Islands go on the shelf their center
+    falls on when laying them all out in a single row, so a shelf may run over its width by half an island.
+    Returns the U and V offset and the placed width and height of each island, in the 0-1 tile.
+    """
+    order = np.argsort(-heights, kind="stable")
+    padded_widths = widths[order] + spacing
+    padded_heights = heights[order] + spacing
+    starts = np.cumsum(padded_widths) - padded_widths
+    centers = starts + padded_widths / 2
+    island_area = float(np.dot(padded_widths, padded_heights))
+
+    min_shelf_width = float(padded_widths.max())
+    shelf_widths = [max(np.sqrt(island_area) * factor, min_shelf_width) for factor in SHELF_WIDTH_FACTORS]
+    # The fullest layout, the first one on a tie
+    shelf_width = max(shelf_widths, key=lambda w: _shelf_fill(centers, padded_widths, padded_heights, island_area, w))
+
+    shelf_firsts = _shelf_firsts(centers, shelf_width)
+    shelf_of_island = np.repeat(np.arange(shelf_firsts.size), np.diff(np.append(shelf_firsts, centers.size)))
+    shelf_heights = padded_heights[shelf_firsts]
+    x = starts - starts[shelf_firsts][shelf_of_island]
+    y = (np.cumsum(shelf_heights) - shelf_heights)[shelf_of_island]
+    layout_width = float(np.add.reduceat(padded_widths, shelf_firsts).max())
+    layout_height = float(shelf_heights.sum())
+    scale_u = 1 / max(layout_width, 1e-8)
+    scale_v = 1 / max(layout_height, 1e-8)
+
+    x_offsets = np.empty(widths.size, dtype=np.float32)
+    y_offsets = np.empty(widths.size, dtype=np.float32)
+    x_offsets[order] = x * scale_u
+    y_offsets[order] = y * scale_v
+    return x_offsets, y_offsets, (widths * scale_u).astype(np.float32), (heights * scale_v).astype(np.float32)
+
+
+def _shelf_firsts(centers: np.ndarray, shelf_width: float) -> np.ndarray:
+    """Index of the first island of each shelf."""
+    shelf_breaks = np.flatnonzero(np.diff((centers // shelf_width).astype(np.int64))) + 1
+    return np.concatenate(([0], shelf_breaks))
+
+
+def _shelf_fill(centers: np.ndarray,
+                padded_widths: np.ndarray,
+                padded_heights: np.ndarray,
+                island_area: float,
+                shelf_width: float) -> float:
+    """The fraction of the layout's bounding box covered by islands, at the given shelf width."""
+    shelf_firsts = _shelf_firsts(centers, shelf_width)
+    layout_width = float(np.add.reduceat(padded_widths, shelf_firsts).max())
+    layout_height = float(padded_heights[shelf_firsts].sum())
+    return island_area / max(layout_width * layout_height, 1e-8)
+
+
+def place_islands(uv: np.ndarray,
+                  loops_island: np.ndarray,
+                  u_min: np.ndarray,
+                  v_min: np.ndarray,
+                  widths: np.ndarray,
+                  heights: np.ndarray,
+                  placement: _Placement,
+                  chunk_size: int | None = None) -> np.ndarray:
+    """
+    Move the loops of each island to its placement in the tile, returns the new UVs.
+    With a chunk_size, the UVs are moved in place (uv is returned), a chunk at a time using a single scratch buffer.
+    """
+    x_offsets, y_offsets, placed_widths, placed_heights = placement
+
+    if chunk_size is None:
+        # normalize islands
+        u_norm = (uv[:, 0] - u_min[loops_island]) / (widths[loops_island] + 1e-8)
+        v_norm = (uv[:, 1] - v_min[loops_island]) / (heights[loops_island] + 1e-8)
+
+        uv_new = np.empty_like(uv)
+        uv_new[:, 0] = u_norm * placed_widths[loops_island] + x_offsets[loops_island]
+        uv_new[:, 1] = v_norm * placed_heights[loops_island] + y_offsets[loops_island]
+        return uv_new
+
+    # Per island: new = (old - min) * scale + offset
+    scales_u = (placed_widths / (widths + 1e-8)).astype(uv.dtype)
+    scales_v = (placed_heights / (heights + 1e-8)).astype(uv.dtype)
+    scratch = np.empty(min(chunk_size, len(loops_island)), dtype=uv.dtype)
+
+    for start in range(0, len(loops_island), chunk_size):
+        chunk_islands = loops_island[start:start + chunk_size]
+        chunk_scratch = scratch[:chunk_islands.size]
+        for axis, mins, scales, offsets in ((0, u_min, scales_u, x_offsets), (1, v_min, scales_v, y_offsets)):
+            coords = uv[start:start + chunk_size, axis]
+            np.take(mins, chunk_islands, out=chunk_scratch, mode="clip")
+            coords -= chunk_scratch
+            np.take(scales, chunk_islands, out=chunk_scratch, mode="clip")
+            coords *= chunk_scratch
+            np.take(offsets, chunk_islands, out=chunk_scratch, mode="clip")
+            coords += chunk_scratch
+
+    return uv
+
+
+def packing_quality(placed_widths: np.ndarray, placed_heights: np.ndarray) -> tuple[float, float]:
+    """
+    How well a packing uses the texture: The fraction of the tile covered by islands and the median of the shorter
+    side of the islands (times the texture size that's the texels across a typical island, i.e. a strand).
+    """
+    coverage = float(np.dot(placed_widths, placed_heights))
+    median_short_side = float(np.median(np.minimum(placed_widths, placed_heights)))
+    return coverage, median_short_side
@@ -0,0 +1,8 @@
+import sys
+from pathlib import Path
+
+# The repository root (the add-on package) and the benchmarks (import_without_blender), for modules that do not need
+# Blender. Tests of modules that do are skipped unless bpy can be imported.
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
@@ -0,0 +1,59 @@
+import io
+import json
+
+import pytest
+
+from common import import_without_blender
+
+DsonStreamParser = import_without_blender("dson_stream_parser").DsonStreamParser
+
+FLOATS = {
+    "asset_info": {"id": "/data/floats.duf", "revision": 1.5},
+    "geometry_library": [{"vertices": [[0.5, -1.25e-3, 1e10]]}],
+    "node_library": [0.5, 1.25, -0.0, 12345.678, 1e5, 2E-7, -3.5e+12, 0, -17, 1.0e0, [6.02e23, {"x": -0.125}]],
+    "scene": {"nodes": [{"id": "a", "scale": 100.0}], "materials": [1e-9, 2.5E+3]},
+}
+FLOATS_DOCUMENT = json.dumps(FLOATS, separators=(",", ":"))
+FLOATS_KEEP_PATHS = [("asset_info",), ("node_library",), ("scene", "materials")]
+
+
+class SplitStream(io.StringIO):
+    """Returns the first split characters in the first read, moving all later chunk boundaries along."""
+
+    def __init__(self, document: str, split: int):
+        super().__init__(document)
+        self._split = split
+
+    def read(self, size: int = -1) -> str:
+        if self._split is not None:
+            size, self._split = self._split, None
+        return super().read(size)
+
+
+def parse(stream: io.StringIO, keep_paths, chunk_size: int) -> dict:
+    parser = DsonStreamParser(stream, keep_paths)
+    parser.CHUNK_SIZE = chunk_size
+    return parser.parse()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7])
+def test_numbers_split_at_every_offset(chunk_size):
+    expected = {
+        "asset_info": FLOATS["asset_info"],
+        "node_library": FLOATS["node_library"],
+        "scene": {"materials": FLOATS["scene"]["materials"]},
+    }
+    for split in range(1, len(FLOATS_DOCUMENT)):
+        result = parse(SplitStream(FLOATS_DOCUMENT, split), FLOATS_KEEP_PATHS, chunk_size)
+        assert result == expected, f"chunk boundary at {split}"
+
+
+def test_list_of_floats_split_in_a_float():
+    document = '{"node_library": [0.5, 1.25]}'
+    for split in range(1, len(document)):
+        assert parse(SplitStream(document, split), [("node_library",)], 64) == {"node_library": [0.5, 1.25]}
+
+
+def test_malformed_number():
+    with pytest.raises(Exception, match="Malformed DSON document"):
+        parse(io.StringIO('{"node_library": [0.x]}'), [("node_library",)], 4)
@@ -0,0 +1,95 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("bpy")
+
+# pylint: disable=wrong-import-position
+from jurajis_daz_materials_to_blender.operators.actions.import_object_materials import (
+    MaterialImportOperatorBase, MATERIAL_FINGERPRINT_PROP, _BuiltMaterials)
+from jurajis_daz_materials_to_blender.utils.dson.dson_data import DsonChannels, DsonChannelMap, DsonFloatChannel
+
+
+class FakeNodes(list):
+    def clear(self):
+        del self[:]
+
+
+class FakeMaterial:
+    def __init__(self, name: str):
+        self.name = name
+        self.use_nodes = False
+        self.node_tree = SimpleNamespace(nodes=FakeNodes())
+        self._props = {}
+
+    def get(self, key, default=None):
+        return self._props.get(key, default)
+
+    def pop(self, key, default=None):
+        return self._props.pop(key, default)
+
+    def __setitem__(self, key, value):
+        self._props[key] = value
+
+    def as_pointer(self) -> int:
+        return id(self)
+
+
+class FakeMaterials(list):
+    def __contains__(self, name):
+        return any(m.name == name for m in self)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return next(m for m in self if m.name == key)
+        return super().__getitem__(key)
+
+    def values(self):
+        return list(self)
+
+
+class Applier:
+    object_dependent = False
+    import_settings = ()
+    fail = False
+
+    def __init__(self, props, b_object, node_tree):
+        self._node_tree = node_tree
+
+    def apply_shader_group(self, channels):
+        self._node_tree.nodes.append("Image Texture")
+        if Applier.fail:
+            raise Exception("Failed to load image")
+        self._node_tree.nodes.append("Shader Group")
+
+
+def apply_materials(b_object, dson_materials, rebuild_unchanged: bool) -> tuple[int, int]:
+    operator = SimpleNamespace(rebuild_unchanged=rebuild_unchanged,
+                               report_warning=print,
+                               _find_applier_by_type_id=lambda type_id: Applier)
+    props = SimpleNamespace(import_settings_fingerprint=lambda setting_names: "settings")
+    # noinspection PyProtectedMember
+    return MaterialImportOperatorBase._apply_materials(operator, b_object, dson_materials, props, _BuiltMaterials(), {})
+
+
+def test_failed_build_is_rebuilt_by_next_import():
+    material = FakeMaterial("Skin")
+    b_object = SimpleNamespace(name="Genesis", data=SimpleNamespace(materials=FakeMaterials([material])))
+    dson_materials = [DsonChannels("Skin", "pbr_skin", DsonChannelMap({"a": DsonFloatChannel(1.0, 0.0, None)}))]
+
+    assert apply_materials(b_object, dson_materials, rebuild_unchanged=False) == (1, 0)
+    assert apply_materials(b_object, dson_materials, rebuild_unchanged=False) == (1, 1)
+
+    Applier.fail = True
+    try:
+        with pytest.raises(Exception, match="Failed to load image"):
+            apply_materials(b_object, dson_materials, rebuild_unchanged=True)
+    finally:
+        Applier.fail = False
+    assert material.get(MATERIAL_FINGERPRINT_PROP) is None
+    assert material.node_tree.nodes == ["Image Texture"]
+
+    # Not kept as unchanged, the partial node tree is built again
+    assert apply_materials(b_object, dson_materials, rebuild_unchanged=False) == (1, 0)
+    assert material.get(MATERIAL_FINGERPRINT_PROP) is not None
+    assert material.node_tree.nodes == ["Image Texture", "Shader Group"]